@@ -1,15 +1,24 @@
 
-from group_urls import group_urls_from_json
-from github_utils import download_json_file, upload_excel_file
+from utils.exporters import EXPORT_FORMATS
+import argparse
 import os
 
 def main():
+    parser = argparse.ArgumentParser(description="Group site URLs and upload the Excel export")
+    parser.add_argument('--format', dest='formats', action='append', choices=EXPORT_FORMATS,
+                        help="Additional export formats written next to grouped_urls.xlsx")
+    args = parser.parse_args()
+    # pandas and PyGithub load only once there is work to do, so --help answers instantly
+    from group_urls import group_urls_from_json
+    from github_utils import download_json_file, upload_excel_file
+
     GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
     REPO = "meejain/url-pattern-grouper-agent"
     JSON_PATH = "site-urls.json"
 
     download_json_file(GITHUB_TOKEN, REPO, JSON_PATH)
-    output_file = group_urls_from_json(JSON_PATH)
+    # The Excel file is always written since it is what gets uploaded
+    group_urls_from_json(JSON_PATH, formats=['xlsx'] + (args.formats or []))
     upload_excel_file(GITHUB_TOKEN, REPO, "grouped_urls.xlsx", "Grouped URLs exported via agent")
 
 if __name__ == "__main__":
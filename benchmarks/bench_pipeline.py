@@ -0,0 +1,376 @@
+"""Offline benchmarks of the URL processing pipeline, stage by stage, on synthetic sites
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pipeline --sizes 1000 10000 100000 --output bench_results.json
+    python -m benchmarks.bench_pipeline --sizes 1000000 --no-memory --compare bench_results.json
+
+Scraping is stubbed with deterministic results, so runs need no network and
+are comparable across commits. Each stage is timed (wall and CPU) and then,
+unless --no-memory is given, run again under tracemalloc for its peak
+allocation, since tracing would otherwise distort the timings. Startup cost
+(a fresh interpreter importing each entry point, and the CLI regrouping a
+small site) is measured once per run in subprocesses.
+
+Parse scaling runs the threaded scraper's fetch/parse pipeline over
+synthetic pages, behind a stub session with a fixed latency, once without a
+parse pool and once per pool size up to the available cores, so the
+pages/second show how parsing scales with more cores.
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+
+import pandas as pd
+
+from benchmarks.synthetic_site import write_site
+from group_urls import group_urls_from_json
+from utils.exporters import export_dataframe
+from utils.frame_memory import memory_report
+from utils.iframe_memo import IframeMemo
+from utils.inventory import Inventory
+from utils.metrics import peak_rss_mb
+from utils.parse_pool import available_cores, create_parse_pool
+from utils.report_stats import compute_report_stats, write_report
+from utils.scrape_result import ScrapeResult, NO_CONTENT, error_result
+from utils.page_content import count_forms
+from utils.url_processor import add_url_features, group_patterns, iter_scrape_results, output_frame, template_columns
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+# Fresh-interpreter timings are short and noisy, so each command runs this many times (median kept)
+STARTUP_REPEATS = 5
+# Size of the site regrouped by the `cli.py group` startup measurement
+STARTUP_SITE_URLS = 1000
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Parse scaling: pages scraped per pool size, stub network latency per request and fetching threads
+PARSE_SCALING_PAGES = 100
+PARSE_SCALING_LATENCY = 0.005
+PARSE_SCALING_FETCH_WORKERS = 3
+
+
+def stub_scrape_results(urls):
+    """Deterministic stand-in for scrape_urls_for_content: a realistic mix of outcomes"""
+    results = {}
+    for url in urls:
+        h = int(hashlib.md5(url.encode()).hexdigest()[:8], 16)
+        if h % 13 == 0:
+            results[url] = error_result('Timeout')
+        elif h % 3:
+            results[url] = NO_CONTENT
+        else:
+            results[url] = ScrapeResult(has_forms=True, form_count=h % 4 + 1, form_types='Search',
+                                        form_details='GET form (action: /search)',
+                                        has_iframes=h % 7 == 0, iframe_count=int(h % 7 == 0),
+                                        iframe_sources='External Content' if h % 7 == 0 else '',
+                                        iframe_forms_count=int(h % 7 == 0),
+                                        iframe_with_forms_count=int(h % 7 == 0), status='Success')
+    return results
+
+
+def pipeline_stages(site_path, inventory_path, work_dir, export_formats):
+    """The process_urls / group_urls stages as (name, fn) pairs sharing one state dict
+
+    The stages call the same functions as process_urls, so the timings follow
+    the production code. Each fn can run more than once (the memory pass
+    repeats it) and leaves the same state behind.
+    """
+    state = {}
+
+    def load():
+        with open(site_path) as f:
+            state['urls'] = json.load(f)['urls']
+        state['template_index'] = Inventory(inventory_path).template_index
+        state['base_df'] = pd.DataFrame(state['urls'])
+
+    def features():
+        state['urls_df'] = add_url_features(state['base_df'], state['scrape_results'])
+
+    def grouping():
+        state['urls_df']['group'], state['group_index'] = group_patterns(state['urls_df']['pattern'])
+
+    def normalized_grouping():
+        group_patterns(state['urls_df']['pattern'], normalize_segments=True)
+
+    def hierarchical_grouping():
+        group_patterns(state['urls_df']['pattern'], grouping='hierarchical')
+
+    def template_lookup():
+        urls_df = state['urls_df']
+        urls_df['template_details'], urls_df['template'], state['labels'] = template_columns(
+            urls_df['url'], state['template_index'])
+
+    def template_clustering():
+        template_columns(state['urls_df']['url'], state['template_index'], template_similarity=0.8)
+
+    def sort():
+        state['df'] = output_frame(state['urls_df'], state['group_index'])
+
+    def report():
+        stats = compute_report_stats(state['df'], labels=state['labels'])
+        write_report(io.StringIO(), stats, 'Benchmark Customer', 'www.example.com')
+
+    def export():
+        export_dataframe(state['df'], os.path.join(work_dir, 'amsbasic-bench.xlsx'),
+                         formats=export_formats, split_by='group', labels=state['labels'])
+
+    def group_urls():
+        group_urls_from_json(site_path, os.path.join(work_dir, 'grouped_urls.xlsx'))
+
+    return state, [
+        ('load', load),
+        ('features', features),
+        ('grouping', grouping),
+        ('normalized_grouping', normalized_grouping),
+        ('hierarchical_grouping', hierarchical_grouping),
+        ('template_lookup', template_lookup),
+        ('template_clustering', template_clustering),
+        ('sort', sort),
+        ('report', report),
+        ('export', export),
+        ('group_urls', group_urls),
+    ]
+
+
+def measure(fn, trace_memory=True):
+    """Wall/CPU seconds of one run of fn, plus its tracemalloc peak from a second run"""
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        fn()
+        result = {
+            'wall_s': round(time.perf_counter() - wall_start, 4),
+            'cpu_s': round(time.process_time() - cpu_start, 4),
+        }
+        if trace_memory:
+            tracemalloc.start()
+            fn()
+            result['peak_alloc_mb'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+            tracemalloc.stop()
+    return result
+
+
+def run_size(n_urls, shape, trace_memory=True, export_formats=('xlsx',), seed=0):
+    with tempfile.TemporaryDirectory(prefix='url-bench-') as work_dir:
+        gen_start = time.perf_counter()
+        site_path, inventory_path = write_site(work_dir, n_urls, seed=seed, **shape)
+        generate_s = time.perf_counter() - gen_start
+        print(f"📦 {n_urls} URLs: generated site in {generate_s:.1f}s "
+              f"(inventory {os.path.getsize(inventory_path) / 2**20:.1f} MB)")
+
+        state, stages = pipeline_stages(site_path, inventory_path, work_dir, export_formats)
+        results = {}
+        for name, fn in stages:
+            if name == 'features':
+                # Scraping itself is stubbed out and not measured
+                state['scrape_results'] = stub_scrape_results(state['base_df']['url'])
+            results[name] = measure(fn, trace_memory=trace_memory)
+            memory = f", peak {results[name]['peak_alloc_mb']} MB" if trace_memory else ''
+            print(f"   ⏱️  {name}: {results[name]['wall_s']:.3f}s wall, {results[name]['cpu_s']:.3f}s cpu{memory}")
+
+        return {
+            'urls': n_urls,
+            'groups': len(state['group_index']),
+            'templates': int(state['df']['template'].nunique()),
+            'inventory_mb': round(os.path.getsize(inventory_path) / 2**20, 2),
+            'stages': results,
+            'total_wall_s': round(sum(r['wall_s'] for r in results.values()), 4),
+            'frame_memory_mb': round(sum(memory_report(state['df']).values()) / 2**20, 2),
+            'peak_rss_mb': peak_rss_mb(),
+        }
+
+
+def synthetic_page_html(sections=150):
+    """A content page with a search form, a contact form and a form iframe among `sections` cards"""
+    cards = ''.join(f'<div class="card c{i}"><h3>Item {i}</h3><p>Text <a href="/p/{i}">link</a> <span>more</span>'
+                    f'</p><ul><li>a</li><li>b</li></ul></div>' for i in range(sections))
+    return (f'<html><head><title>Page</title></head><body><form action="/search" method="get">'
+            f'<input type="text" name="q" placeholder="Search"></form>{cards}<form id="contact"><input name="n">'
+            f'<input type="email"><textarea></textarea><select></select></form>'
+            f'<iframe src="https://widgets.example.com/form"></iframe></body></html>').encode()
+
+
+class StubResponse:
+    def __init__(self, content):
+        self.status_code = 200
+        self.content = content
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+
+class StubSession:
+    """Stands in for HttpSession: every GET sleeps `latency` (releasing the GIL like real I/O) and returns `html`"""
+
+    def __init__(self, html, latency):
+        self.html = html
+        self.latency = latency
+
+    def get(self, url, **kwargs):
+        time.sleep(self.latency)
+        return StubResponse(self.html)
+
+
+def measure_parse_scaling(pages=PARSE_SCALING_PAGES, latency=PARSE_SCALING_LATENCY,
+                          fetch_workers=PARSE_SCALING_FETCH_WORKERS):
+    """Pages/second of the threaded scraper pipeline without a parse pool and with 1..cores parse processes"""
+    cores = available_cores()
+    session = StubSession(synthetic_page_html(), latency)
+    urls = [f"https://www.example.com/page-{i}.html" for i in range(pages)]
+    points = []
+    for parse_workers in sorted({0, 1, cores, *(2**i for i in range(cores.bit_length()) if 2**i <= cores)}):
+        parse_pool = create_parse_pool(parse_workers)
+        try:
+            if parse_pool:
+                # Start the worker processes before timing
+                list(parse_pool.map(count_forms, [b'<html></html>'] * parse_workers))
+            start = time.perf_counter()
+            for _ in iter_scrape_results(urls, max_workers=fetch_workers,
+                                         max_in_flight=(fetch_workers + parse_workers) * 4, session=session,
+                                         iframe_memo=IframeMemo(), parse_pool=parse_pool):
+                pass
+            wall_s = time.perf_counter() - start
+        finally:
+            if parse_pool:
+                parse_pool.shutdown()
+        point = {'parse_workers': parse_workers, 'wall_s': round(wall_s, 4), 'pages_per_s': round(pages / wall_s, 1)}
+        point['speedup'] = round(point['pages_per_s'] / points[0]['pages_per_s'], 2) if points else 1.0
+        points.append(point)
+        print(f"   🧩 {parse_workers} parse processes: {point['pages_per_s']:.1f} pages/s ({point['speedup']:.2f}x)")
+    return {'cores': cores, 'pages': pages, 'latency_s': latency, 'fetch_workers': fetch_workers, 'points': points}
+
+
+def startup_commands(work_dir):
+    """Commands timed by measure_startup, as argument lists for a fresh interpreter run from the repo root"""
+    site_path, _ = write_site(work_dir, STARTUP_SITE_URLS)
+    return {
+        'python': ['-c', 'pass'],
+        'cli --help': ['cli.py', '--help'],
+        'import group_urls': ['-c', 'import group_urls'],
+        'import claude_code_gen': ['-c', 'import claude_code_gen'],
+        'import url_processor': ['-c', 'import utils.url_processor'],
+        f'cli group ({STARTUP_SITE_URLS} URLs)': ['cli.py', 'group', site_path,
+                                                  '-o', os.path.join(work_dir, 'grouped_urls.xlsx')],
+    }
+
+
+def measure_startup(repeats=STARTUP_REPEATS):
+    """Median wall seconds of each startup command (interpreter start included)"""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='url-bench-startup-') as work_dir:
+        for name, command in startup_commands(work_dir).items():
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                subprocess.run([sys.executable, *command], cwd=REPO_ROOT, check=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                timings.append(time.perf_counter() - start)
+            results[name] = round(sorted(timings)[len(timings) // 2], 4)
+            print(f"   🚀 {name}: {results[name]:.3f}s")
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(previous, current):
+    """Print per-stage wall time ratios (current / previous) for the sizes both runs share"""
+    previous_runs = {run['urls']: run for run in previous.get('runs', [])}
+    print(f"\n📊 Compared with {previous.get('environment', {}).get('commit') or 'previous run'}:")
+    previous_startup = previous.get('startup', {})
+    for name, wall_s in current.get('startup', {}).items():
+        if previous_startup.get(name):
+            print(f"   startup {name}: {previous_startup[name]:.3f}s -> {wall_s:.3f}s "
+                  f"({wall_s / previous_startup[name]:.2f}x)")
+    previous_points = {point['parse_workers']: point
+                       for point in previous.get('parse_scaling', {}).get('points', [])}
+    for point in current.get('parse_scaling', {}).get('points', []):
+        before = previous_points.get(point['parse_workers'])
+        if before:
+            print(f"   {point['parse_workers']} parse processes: {before['pages_per_s']:.1f} -> "
+                  f"{point['pages_per_s']:.1f} pages/s ({point['pages_per_s'] / before['pages_per_s']:.2f}x)")
+    for run in current['runs']:
+        before = previous_runs.get(run['urls'])
+        if not before:
+            continue
+        print(f"   {run['urls']} URLs:")
+        for name, stage in run['stages'].items():
+            old = before['stages'].get(name)
+            if old and old['wall_s']:
+                print(f"     {name}: {old['wall_s']:.3f}s -> {stage['wall_s']:.3f}s ({stage['wall_s'] / old['wall_s']:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the URL pipeline stages on synthetic sites")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Site sizes in URLs (default: 1k 10k 100k; up to 1M)")
+    parser.add_argument('--output', default='bench_results.json', help="Machine-readable results file")
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc pass (faster on 1M URLs)")
+    parser.add_argument('--format', dest='formats', action='append', choices=['xlsx', 'csv', 'parquet'],
+                        help="Export formats to time (default: xlsx)")
+    parser.add_argument('--parse-pages', type=int, default=PARSE_SCALING_PAGES,
+                        help="Pages scraped per parse pool size in the parse scaling run (0 skips it)")
+    parser.add_argument('--blocks', type=int, default=40)
+    parser.add_argument('--templates', type=int, default=60)
+    parser.add_argument('--blocks-per-page', type=int, default=6)
+    parser.add_argument('--instances-per-block', type=int)
+    parser.add_argument('--max-depth', type=int, default=5)
+    parser.add_argument('--locale-share', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    shape = {
+        'n_blocks': args.blocks,
+        'n_templates': args.templates,
+        'blocks_per_page': args.blocks_per_page,
+        'instances_per_block': args.instances_per_block,
+        'max_depth': args.max_depth,
+        'locale_share': args.locale_share,
+    }
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+
+    print("🚀 Startup (fresh interpreter):")
+    results = {'environment': environment(), 'shape': shape, 'startup': measure_startup(), 'runs': []}
+    if args.parse_pages > 0:
+        print("🧩 Parse scaling (stub network):")
+        results['parse_scaling'] = measure_parse_scaling(pages=args.parse_pages)
+    for n_urls in args.sizes:
+        results['runs'].append(run_size(n_urls, shape, trace_memory=not args.no_memory,
+                                        export_formats=tuple(args.formats or ['xlsx']), seed=args.seed))
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"✅ Benchmark results written: {args.output}")
+
+    if previous:
+        compare(previous, results)
+
+
+if __name__ == "__main__":
+    main()
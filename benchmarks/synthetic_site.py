@@ -0,0 +1,141 @@
+"""Generate synthetic site-urls.json + inventory.json pairs for benchmarking
+
+    python -m benchmarks.synthetic_site --urls 100000 --output /tmp/site
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+
+SECTIONS = ['about', 'business', 'residential', 'products', 'services', 'support', 'news', 'blog',
+            'careers', 'investors', 'community', 'safety', 'energy', 'billing', 'events', 'help']
+WORDS = ['overview', 'pricing', 'plans', 'programs', 'solutions', 'faq', 'contact', 'resources',
+         'guides', 'stories', 'press', 'locations', 'rates', 'efficiency', 'outages', 'payments',
+         'accounts', 'savings', 'rebates', 'solar', 'electric', 'vehicles', 'home', 'smart']
+BLOCK_NAMES = ['header', 'footer', 'hero', 'cards', 'columns', 'tabs', 'accordion', 'carousel',
+               'form', 'table', 'video', 'quote', 'teaser', 'banner', 'breadcrumb', 'search']
+SOURCES = ['SITEMAPS', 'CRAWL', 'SITEMAPS', 'SITEMAPS']
+
+
+def generate_urls(n_urls, domain='www.example.com', max_depth=5, locales=('es', 'fr', 'de', 'ja'),
+                  locale_share=0.2, external_share=0.02, seed=0):
+    """Return a list of unique, site-shaped URLs
+
+    Paths are 1..max_depth segments drawn from a section/word vocabulary, so
+    URLs share prefixes the way real sites do; `locale_share` of them get a
+    two-letter locale prefix and `external_share` live on other hosts.
+    """
+    rng = random.Random(seed)
+    # More sections on bigger sites so groups stay a realistic size
+    sections = SECTIONS + [f"{rng.choice(SECTIONS)}-{i}" for i in range(max(0, n_urls // 2000))]
+    urls = [f"https://{domain}/"]
+    for i in range(1, n_urls):
+        host = domain if rng.random() >= external_share else f"partner{rng.randint(1, 20)}.example.org"
+        depth = rng.randint(1, max_depth)
+        segments = [rng.choice(sections)] + [rng.choice(WORDS) for _ in range(depth - 1)]
+        # Unique file name; some sites use numeric ids, others slugs
+        if rng.random() < 0.3:
+            segments.append(str(100000 + i))
+        else:
+            segments[-1] = f"{segments[-1]}-{i}.html"
+        if locales and rng.random() < locale_share:
+            segments.insert(0, rng.choice(locales))
+        urls.append(f"https://{host}/" + '/'.join(segments))
+    return urls
+
+
+def site_urls_entry(url, rng):
+    target_path = '/' + url.split('://', 1)[-1].partition('/')[2].lower()
+    return {
+        'url': url,
+        'source': rng.choice(SOURCES),
+        'targetPath': target_path,
+        'id': hashlib.sha1(url.encode()).hexdigest(),
+    }
+
+
+def write_site(folder, n_urls, n_blocks=40, n_templates=60, blocks_per_page=6, inventory_share=0.9,
+               instances_per_block=None, max_depth=5, locales=('es', 'fr', 'de', 'ja'), locale_share=0.2,
+               seed=0, domain='www.example.com'):
+    """Write site-urls.json and inventory.json for a synthetic site into `folder`
+
+    Each page in the inventory (`inventory_share` of the URLs) uses one of
+    `n_templates` templates, each a random set of `blocks_per_page` of the
+    `n_blocks` blocks. With `instances_per_block` every block is instead placed
+    on that many inventory pages drawn at random, so block sizes are fixed and
+    pages carry arbitrary block combinations. The inventory is written block by
+    block so even 1M-URL sites are generated without holding the whole document
+    in memory.
+    Returns the two file paths.
+    """
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    urls = generate_urls(n_urls, domain=domain, max_depth=max_depth, locales=locales,
+                         locale_share=locale_share, seed=seed)
+
+    site_path = os.path.join(folder, 'site-urls.json')
+    with open(site_path, 'w') as f:
+        f.write(json.dumps({'originUrl': f"https://{domain}", 'customerName': 'Benchmark Customer',
+                            'lastCrawled': f"https://{domain}"})[:-1])
+        f.write(', "urls": [')
+        for i, url in enumerate(urls):
+            f.write((', ' if i else '') + json.dumps(site_urls_entry(url, rng)))
+        f.write(']}')
+
+    block_names = [BLOCK_NAMES[i] if i < len(BLOCK_NAMES) else f"block{i}" for i in range(n_blocks)]
+    blocks_per_page = min(blocks_per_page, n_blocks)
+    templates = [rng.sample(range(n_blocks), blocks_per_page) for _ in range(n_templates)]
+    instances = [[] for _ in range(n_blocks)]
+    if instances_per_block is None:
+        for url in urls:
+            if rng.random() < inventory_share:
+                for block in rng.choice(templates):
+                    instances[block].append(url)
+    else:
+        pages = [url for url in urls if rng.random() < inventory_share]
+        # Keep each block's instances in page order, like an inventory crawl lists them
+        instances = [[pages[i] for i in sorted(rng.sample(range(len(pages)), min(instances_per_block, len(pages))))]
+                     for _ in range(n_blocks)]
+
+    inventory_path = os.path.join(folder, 'inventory.json')
+    with open(inventory_path, 'w') as f:
+        f.write('{"fragments": [], "blocks": [')
+        for i, (name, block_urls) in enumerate(zip(block_names, instances)):
+            block = {'name': name, 'cluster': i + 1, 'source': name.title(), 'target': f"{name.title()} ({name}{i})",
+                     'key': f"{name}{i}"}
+            f.write((', ' if i else '') + json.dumps(block)[:-1] + ', "instances": [')
+            for j, url in enumerate(block_urls):
+                url_hash = hashlib.sha1(url.encode()).hexdigest()
+                f.write((', ' if j else '') + json.dumps({
+                    'url': url, 'urlHash': url_hash, 'uuid': f"{url_hash[:8]}-{i:02d}",
+                    'xpath': f"/html[1]/body[1]/div[{i + 1}]",
+                }))
+            f.write(']}')
+        f.write('], "outliers": []}')
+    return site_path, inventory_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic site-urls.json + inventory.json pair")
+    parser.add_argument('--urls', type=int, default=10000, help="Number of URLs")
+    parser.add_argument('--output', default='.', help="Folder to write the two files to")
+    parser.add_argument('--blocks', type=int, default=40, help="Distinct blocks in the inventory")
+    parser.add_argument('--templates', type=int, default=60, help="Distinct block combinations")
+    parser.add_argument('--blocks-per-page', type=int, default=6, help="Block instances per page")
+    parser.add_argument('--instances-per-block', type=int,
+                        help="Pages each block is placed on (default: follows from the templates)")
+    parser.add_argument('--max-depth', type=int, default=5, help="Maximum path depth")
+    parser.add_argument('--locale-share', type=float, default=0.2, help="Share of URLs with a locale prefix")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    site_path, inventory_path = write_site(args.output, args.urls, n_blocks=args.blocks, n_templates=args.templates,
+                                           blocks_per_page=args.blocks_per_page,
+                                           instances_per_block=args.instances_per_block, max_depth=args.max_depth,
+                                           locale_share=args.locale_share, seed=args.seed)
+    print(f"✅ Wrote {site_path} and {inventory_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,17 @@
-import anthropic
+import argparse
 import os
 import json
 from pathlib import Path
 import importlib.util
 import sys
+from utils.exporters import EXPORT_FORMATS
+from utils.metrics import PIPELINE_STAGES
+from utils.batch import find_site_pairs
 
 def generate_code(prompt, context_vars=None):
     """Generate code using Claude."""
+    # Only needed when the processor has to be generated; running an existing one skips the SDK import
+    import anthropic
     client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
     
     # Read the working implementation from claude_agent.py
@@ -140,8 +145,8 @@ def save_generated_code(code, file_path):
     with open(file_path, 'w') as f:
         f.write(code)
 
-def load_and_execute_processor(processor_path, urls_data):
-    """Load and execute the generated URL processor code."""
+def load_processor(processor_path):
+    """Import the generated URL processor module (None if it cannot be loaded)."""
     # Add utils directory to Python path
     utils_dir = str(Path(processor_path).parent.absolute())
     if utils_dir not in sys.path:
@@ -161,6 +166,47 @@ def load_and_execute_processor(processor_path, urls_data):
         return None
         
     spec.loader.exec_module(module)
+    return module
+
+def processor_options(resume=False, incremental=False, export_formats=None, trace_memory=False,
+                      profile_stage=None, parse_workers=None, grouping=None, group_depth=None,
+                      template_similarity=None, normalize_segments=False, engine=None, max_workers=None):
+    """Keyword arguments for process_urls, leaving unset options to its defaults."""
+    options = {}
+    if resume:
+        options['resume'] = True
+    if incremental:
+        options['incremental'] = True
+    if export_formats:
+        options['export_formats'] = export_formats
+    if trace_memory:
+        options['trace_memory'] = True
+    if profile_stage:
+        options['profile_stage'] = profile_stage
+    if parse_workers is not None:
+        options['parse_workers'] = parse_workers
+    if grouping:
+        options['grouping'] = grouping
+    if group_depth is not None:
+        options['group_depth'] = group_depth
+    if template_similarity:
+        options['template_similarity'] = template_similarity
+    if normalize_segments:
+        options['normalize_segments'] = True
+    if engine:
+        options['scrape_engine'] = engine
+    if max_workers is not None:
+        options['max_workers'] = max_workers
+    return options
+
+def load_and_execute_processor(processor_path, urls_data, resume=False, incremental=False, export_formats=None,
+                               trace_memory=False, profile_stage=None, parse_workers=None, grouping=None,
+                               group_depth=None, template_similarity=None, normalize_segments=False, engine=None,
+                               max_workers=None):
+    """Load and execute the generated URL processor code."""
+    module = load_processor(processor_path)
+    if module is None:
+        return None
     
     # Execute the processing function with just the urls list from the JSON data
     if hasattr(module, 'process_urls'):
@@ -168,12 +214,96 @@ def load_and_execute_processor(processor_path, urls_data):
         Path('basic_scoping').mkdir(parents=True, exist_ok=True)
         # Pass only the urls list and the domain from originUrl
         domain = urls_data.get('originUrl', '').split('//')[-1].split('/')[0]
-        return module.process_urls(urls_data.get('urls', []), domain)
+        options = processor_options(resume, incremental, export_formats, trace_memory, profile_stage, parse_workers,
+                                    grouping, group_depth, template_similarity, normalize_segments, engine, max_workers)
+        return module.process_urls(urls_data.get('urls', []), domain, **options)
     else:
         print("⚠️ Generated code does not have a process_urls function!")
         return None
 
-def main():
+def execute_batch(processor_path, batch_paths, max_customers=4, resume=False, incremental=False,
+                  export_formats=None, trace_memory=False, profile_stage=None, parse_workers=None, grouping=None,
+                  group_depth=None, template_similarity=None, normalize_segments=False, engine=None, max_workers=None):
+    """Run the URL processor for every site/inventory pair found in batch_paths on one shared scraper."""
+    site_pairs = find_site_pairs(batch_paths)
+    if not site_pairs:
+        print("❌ No site-urls/inventory pairs found for the batch!")
+        return None
+    
+    module = load_processor(processor_path)
+    if module is None:
+        return None
+    if not hasattr(module, 'process_batch'):
+        print("⚠️ Generated code does not have a process_batch function!")
+        return None
+    
+    Path('basic_scoping').mkdir(parents=True, exist_ok=True)
+    options = processor_options(resume, incremental, export_formats, trace_memory, profile_stage, parse_workers,
+                                grouping, group_depth, template_similarity, normalize_segments, engine, max_workers)
+    outcomes = module.process_batch(site_pairs, max_customers=max_customers, **options)
+    return all(outcome == 'Success' for outcome in outcomes.values())
+
+def similarity_threshold(value):
+    """argparse type for --template-similarity: a Jaccard threshold in (0, 1]"""
+    threshold = float(value)
+    if not 0 < threshold <= 1:
+        raise argparse.ArgumentTypeError("must be between 0 and 1")
+    return threshold
+
+def non_negative_int(value):
+    """argparse type for counts where 0 is meaningful"""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError("must be at least 0")
+    return number
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return number
+
+def add_processor_arguments(parser):
+    """Add the processor run options (shared with the `scope` subcommand of cli.py)"""
+    parser.add_argument('--resume', action='store_true',
+                        help="Resume an interrupted run from its scrape checkpoint journal")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only scrape URLs added since the previous run (uses the run manifest)")
+    parser.add_argument('--format', dest='formats', action='append', choices=EXPORT_FORMATS,
+                        help="Export format, repeatable (default: xlsx; parquet needs pyarrow)")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Record each stage's tracemalloc peak in metrics.json (slows the run)")
+    parser.add_argument('--profile-stage', choices=PIPELINE_STAGES,
+                        help="Run one stage under cProfile and save its profile next to metrics.json")
+    parser.add_argument('--engine', choices=['threads', 'asyncio'],
+                        help="Scrape engine: threads (default) or asyncio (one event loop, many pages in flight; "
+                             "batch runs always use the shared thread scraper)")
+    parser.add_argument('--max-workers', type=positive_int,
+                        help="Scrape concurrency: worker threads (default: 3, or 8 shared in batch mode) or, "
+                             "with --engine asyncio, pages in flight (default: 200)")
+    parser.add_argument('--parse-workers', type=non_negative_int,
+                        help="HTML parser processes (default: one per CPU core; 0 parses in the fetching threads)")
+    parser.add_argument('--grouping', choices=['pattern', 'hierarchical'],
+                        help="pattern: group URLs sharing a path pattern (default); hierarchical: also roll "
+                             "patterns with fewer than 5 URLs up into their parent paths")
+    parser.add_argument('--group-depth', type=positive_int,
+                        help="Group on at most this many leading path segments")
+    parser.add_argument('--normalize-segments', action='store_true',
+                        help="Group paths that differ only in ids, dates, hashes or long slugs "
+                             "(e.g. news/2024-01-15 and news/2023-11-02 share news/{date})")
+    parser.add_argument('--template-similarity', type=similarity_threshold, metavar='JACCARD',
+                        help="Cluster near-duplicate templates: pages whose block sets have at least this "
+                             "Jaccard similarity (0-1, e.g. 0.8) share a template")
+    parser.add_argument('--batch', nargs='+', metavar='PATH',
+                        help="Process several customers on one shared scraper: site-urls files, folders of "
+                             "site-urls-<name>.json/inventory-<name>.json pairs, or SITE:INVENTORY pairs")
+    parser.add_argument('--batch-customers', type=positive_int, default=4,
+                        help="Customers processed at the same time in batch mode (default: 4)")
+    return parser
+
+def run_processor(args, processor_path='utils/url_processor.py'):
+    """Generate the processor if it does not exist yet, then run it on site-urls.json or the --batch sites"""
     # Use exact same prompt as claude_agent.py
     context_vars = {
         "url": "The complete URL",
@@ -196,8 +326,6 @@ def main():
         "scrape_status": "Status of the scraping attempt (Success, Timeout, Error, etc.)"
     }
     
-    processor_path = 'utils/url_processor.py'
-    
     # Skip code generation if the file already exists
     if not os.path.exists(processor_path):
         prompt = """Process the URLs with these comprehensive requirements:
@@ -323,17 +451,41 @@ CRITICAL REQUIREMENTS:
         code = generate_code(prompt, context_vars)
         save_generated_code(code, processor_path)
     
+    if args.batch:
+        result = execute_batch(processor_path, args.batch, max_customers=args.batch_customers,
+                               resume=args.resume, incremental=args.incremental, export_formats=args.formats,
+                               trace_memory=args.trace_memory, profile_stage=args.profile_stage,
+                               parse_workers=args.parse_workers, grouping=args.grouping,
+                               group_depth=args.group_depth, template_similarity=args.template_similarity,
+                               normalize_segments=args.normalize_segments, engine=args.engine,
+                               max_workers=args.max_workers)
+        if result:
+            print("✅ Batch processing completed successfully!")
+        else:
+            print("❌ Batch processing finished with failures!")
+        return
+    
     # Load URLs data
     with open('site-urls.json', 'r') as f:
         urls_data = json.load(f)
     
     # Execute the processor
-    result = load_and_execute_processor(processor_path, urls_data)
+    result = load_and_execute_processor(processor_path, urls_data, resume=args.resume,
+                                        incremental=args.incremental, export_formats=args.formats,
+                                        trace_memory=args.trace_memory, profile_stage=args.profile_stage,
+                                        parse_workers=args.parse_workers, grouping=args.grouping,
+                                        group_depth=args.group_depth, template_similarity=args.template_similarity,
+                                        normalize_segments=args.normalize_segments, engine=args.engine,
+                                        max_workers=args.max_workers)
     
     if result:
         print("✅ URL processing completed successfully!")
     else:
         print("❌ URL processing failed!")
 
+def main():
+    parser = add_processor_arguments(argparse.ArgumentParser(description="Generate and run the URL processor"))
+    run_processor(parser.parse_args())
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
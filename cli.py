@@ -0,0 +1,100 @@
+import argparse
+import json
+import os
+import sys
+from utils.exporters import EXPORT_FORMATS
+
+# Each subcommand imports what it needs (pandas, openpyxl, the scraper stack) when it runs,
+# so `--help` and small jobs don't pay for modules they never use.
+
+
+def run_group(args):
+    from group_urls import group_urls_from_json
+
+    if os.path.dirname(args.output):
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    output_path = group_urls_from_json(args.site_urls, args.output, formats=args.formats or ['xlsx'])
+    print(f"✅ Grouped URLs exported: {output_path}")
+
+
+def run_scope(args):
+    from claude_code_gen import run_processor
+
+    run_processor(args)
+
+
+def default_site_urls(export_path):
+    """site-urls.json copied next to a scoping export, else the one in the working directory"""
+    copied = os.path.join(os.path.dirname(export_path), 'site-urls.json')
+    return copied if os.path.exists(copied) else 'site-urls.json'
+
+
+def run_report(args):
+    from utils.batch import load_site
+    from utils.exporters import read_export
+    from utils.report_stats import compute_report_stats, write_report
+
+    customer_name, domain, _ = load_site(args.site_urls or default_site_urls(args.export))
+    stats = compute_report_stats(read_export(args.export))
+    report_filename = f"{os.path.splitext(args.export)[0]}_analysis.txt"
+    with open(report_filename, 'w') as f:
+        write_report(f, stats, customer_name, domain)
+    with open(report_filename.replace('.txt', '.json'), 'w') as f:
+        json.dump({'customer': customer_name, 'domain': domain, **stats}, f, indent=2)
+    print(f"✅ Analysis report written: {report_filename}")
+
+
+def run_export(args):
+    from utils.exporters import export_dataframe, read_export
+
+    df = read_export(args.export)
+    if args.output and os.path.dirname(args.output):
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    # Scoping exports split on 'group', grouped_urls exports on 'Group'
+    split_by = next((column for column in ('group', 'Group') if column in df.columns), None)
+    for path in export_dataframe(df, args.output or args.export, formats=args.formats, split_by=split_by):
+        print(f"✅ Exported: {path}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Group, scope and report on site URLs")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    group = commands.add_parser('group', help="Group the URLs of a site-urls file by path pattern (no scraping)")
+    group.add_argument('site_urls', nargs='?', default='site-urls.json',
+                       help="site-urls file to group (default: site-urls.json)")
+    group.add_argument('-o', '--output', default='grouped_urls.xlsx',
+                       help="Export path; its extension is replaced per format (default: grouped_urls.xlsx)")
+    group.add_argument('--format', dest='formats', action='append', choices=EXPORT_FORMATS,
+                       help="Export format, repeatable (default: xlsx)")
+    group.set_defaults(run=run_group)
+
+    scope = commands.add_parser('scope', help="Scrape and scope a site (or a --batch of sites) with the URL processor")
+    # claude_code_gen itself is light; the SDK is only imported if the processor has to be generated
+    from claude_code_gen import add_processor_arguments
+    add_processor_arguments(scope)
+    scope.set_defaults(run=run_scope)
+
+    report = commands.add_parser('report', help="Rebuild the analysis report from an existing scoping export")
+    report.add_argument('export', help="amsbasic-<domain> export (.xlsx, .csv or .parquet)")
+    report.add_argument('--site-urls',
+                        help="site-urls file naming the customer (default: the copy next to the export)")
+    report.set_defaults(run=run_report)
+
+    export = commands.add_parser('export', help="Convert an existing export to other formats")
+    export.add_argument('export', help="Export to convert (.xlsx, .csv or .parquet)")
+    export.add_argument('--format', dest='formats', action='append', choices=EXPORT_FORMATS, required=True,
+                        help="Format to write, repeatable")
+    export.add_argument('-o', '--output',
+                        help="Output path; its extension is replaced per format (default: next to the export)")
+    export.set_defaults(run=run_export)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
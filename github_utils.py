@@ -1,8 +1,11 @@
-from github import Github
-from github.ContentFile import ContentFile
-import os
+def _github():
+    """PyGithub's Github and ContentFile classes, imported on first use so importing this module stays cheap"""
+    from github import Github
+    from github.ContentFile import ContentFile
+    return Github, ContentFile
 
 def download_json_file(token, repo_name, file_path):
+    Github, ContentFile = _github()
     g = Github(token)
     repo = g.get_repo(repo_name)
     contents = repo.get_contents(file_path)
@@ -12,6 +15,7 @@ def download_json_file(token, repo_name, file_path):
     return "site-urls.json"
 
 def upload_excel_file(token, repo_name, file_path, commit_message):
+    Github, ContentFile = _github()
     g = Github(token)
     repo = g.get_repo(repo_name)
     with open(file_path, "rb") as f:
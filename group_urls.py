@@ -1,44 +1,33 @@
 import json
 import pandas as pd
-from collections import defaultdict
-from urllib.parse import urlparse
+from utils.url_features import extract_url_features
+from utils.exporters import export_dataframe
 
-def extract_group_key(path):
-    parts = path.strip("/").split("/")
-    return "/".join(parts[:2]) if len(parts) >= 2 else parts[0] if parts else "/"
-
-def group_urls_from_json(json_path: str, output_path: str = "grouped_urls.xlsx"):
+def group_urls_from_json(json_path: str, output_path: str = "grouped_urls.xlsx", formats=("xlsx",)):
     with open(json_path, "r") as f:
         data = json.load(f)
 
     urls = data.get("urls", [])
-    grouped = defaultdict(list)
-
-    # Group URLs by pattern
-    for entry in urls:
-        path = urlparse(entry["url"]).path
-        key = extract_group_key(path)
-        grouped[key].append(entry)
-
-    all_rows = []
-    group_num = 1
-    for key, entries in grouped.items():
-        assign_group = f"Group {group_num}" if len(entries) > 5 else ""
-        if assign_group:
-            group_num += 1
-        for entry in entries:
-            all_rows.append({
-                "URL": entry["url"],
-                "Source": entry.get("source", ""),
-                "Group": assign_group
-            })
+    df = pd.DataFrame({
+        "URL": [entry["url"] for entry in urls],
+        "Source": [entry.get("source", "") for entry in urls],
+    })
+    features = extract_url_features(df["URL"])
 
-    # Sort so home page URLs come to top
-    def home_first(url):
-        path = urlparse(url).path
-        return (0 if path in ["/", "", "/index.html"] else 1, path)
+    # Group URLs by pattern (first two path segments); groups are numbered in first-seen order
+    key = features["group_key"]
+    first_seen = key.drop_duplicates()
+    key_order = pd.Series(range(len(first_seen)), index=first_seen.values)
+    key_counts = key.value_counts()
+    group_numbers = {k: n for n, k in enumerate((k for k in first_seen if key_counts[k] > 5), start=1)}
+    df["Group"] = key.map(lambda k: f"Group {group_numbers[k]}" if k in group_numbers else "")
 
-    df = pd.DataFrame(all_rows)
-    df = df.sort_values(by="URL", key=lambda col: col.map(home_first))
-    df.to_excel(output_path, index=False)
-    return output_path
\ No newline at end of file
+    # Sort so home page URLs come to top, then by path
+    df["_order"] = key.map(key_order)
+    df["_home"] = (~features["is_home"]).astype(int)
+    df["_path"] = features["path"]
+    df = df.sort_values(by="_order", kind="stable")
+    df = df.sort_values(by=["_home", "_path"], kind="stable")
+    df = df[["URL", "Source", "Group"]]
+    export_dataframe(df, output_path, formats=formats, split_by="Group")
+    return output_path
@@ -0,0 +1,166 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import aiohttp
+from utils.iframe_memo import IframeMemo
+from utils.scheduler import ScrapeProgress
+from utils.page_content import REQUEST_HEADERS, parse_page_content, count_forms, build_content_result
+from utils.scrape_result import error_result
+from utils.parse_pool import create_parse_pool, parse_pool_size
+
+
+async def _in_pool(parse_pool, fn, *args):
+    """Run a parsing function in the process pool (or inline without one)"""
+    if parse_pool is None:
+        return fn(*args)
+    return await asyncio.get_running_loop().run_in_executor(parse_pool, fn, *args)
+
+
+async def _off_loop(fn, *args, executor=None):
+    """Run a blocking call (SQLite cache, journal write) in a thread so the event loop keeps serving requests"""
+    return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+
+async def fetch_iframe_form_count(session, iframe_url, timeout=5, rate_limiter=None, metrics=None,
+                                  parse_pool=None):
+    """Fetch an iframe source on the event loop and count its forms (0 if it can't be scraped)"""
+    try:
+        if rate_limiter:
+            await rate_limiter.wait_async(iframe_url)
+        start = time.perf_counter()
+        try:
+            async with session.get(iframe_url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                html = await response.read()
+        except Exception:
+            if metrics:
+                metrics.record_fetch(iframe_url, time.perf_counter() - start)
+            raise
+        if metrics:
+            metrics.record_fetch(iframe_url, time.perf_counter() - start, len(html), response.status)
+        response.raise_for_status()
+        return await _in_pool(parse_pool, count_forms, html)
+    except Exception:
+        # Silently fail if iframe can't be scraped
+        return 0
+
+
+async def scrape_url_for_content_async(session, url, timeout=8, cache=None, iframe_memo=None,
+                                       rate_limiter=None, metrics=None, parse_pool=None):
+    """Async equivalent of scrape_url_for_content, returning the same ScrapeResult"""
+    start = None
+    try:
+        headers = None
+        cached = await _off_loop(cache.get, url) if cache else None
+        if cached:
+            if cache.is_fresh(cached):
+                cache.record('hits')
+                return cached.result
+            # Revalidate the stale entry with a conditional GET
+            headers = cache.validators(cached)
+
+        if rate_limiter:
+            await rate_limiter.wait_async(url)
+
+        start = time.perf_counter()
+        async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            html = await response.read() if response.status < 300 else b''
+            if metrics:
+                metrics.record_fetch(url, time.perf_counter() - start, len(html), response.status)
+            if cached and response.status == 304:
+                cache.record('revalidated')
+                await _off_loop(cache.touch, url)
+                return cached.result
+            if cache:
+                cache.record('misses')
+            response.raise_for_status()
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+
+        page = await _in_pool(parse_pool, parse_page_content, url, html)
+        iframe_urls = list(dict.fromkeys(i['fetch_url'] for i in page['iframes'] if i['fetch_url']))
+
+        def fetch(iframe_url):
+            return fetch_iframe_form_count(session, iframe_url, rate_limiter=rate_limiter, metrics=metrics,
+                                           parse_pool=parse_pool)
+
+        if iframe_memo:
+            counts = await asyncio.gather(*(iframe_memo.get_async(u, fetch) for u in iframe_urls))
+        else:
+            counts = await asyncio.gather(*(fetch(u) for u in iframe_urls))
+        result = build_content_result(page, dict(zip(iframe_urls, counts)))
+        if cache:
+            await _off_loop(cache.put, url, result, etag, last_modified)
+        return result
+
+    except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as e:
+        # Requests that never got a response still count towards the host's latency
+        if metrics and start is not None:
+            metrics.record_fetch(url, time.perf_counter() - start)
+        if isinstance(e, asyncio.TimeoutError):
+            return error_result('Timeout')
+        return error_result('Connection Error')
+    except aiohttp.ClientResponseError as e:
+        return error_result(f'HTTP {e.status}')
+    except Exception as e:
+        return error_result(f'Error: {str(e)[:50]}')
+
+
+async def _scrape_all(urls, max_concurrency, per_host_limit, cache, rate_limiter, sink, progress, metrics,
+                      parse_pool):
+    # The connector enforces both the global and the per-host connection limits
+    connector = aiohttp.TCPConnector(limit=max_concurrency, limit_per_host=per_host_limit, ssl=False)
+    async with aiohttp.ClientSession(connector=connector, headers=REQUEST_HEADERS) as session:
+        results = {}
+        url_iter = iter(urls)
+        # Each distinct iframe source is fetched once per run
+        iframe_memo = IframeMemo()
+        # The sink (checkpoint journal) is written from one thread, in completion order, off the event loop
+        writer = ThreadPoolExecutor(max_workers=1) if sink else None
+
+        async def worker():
+            # Workers pull from the shared iterator, so at most max_concurrency pages are in flight
+            for url in url_iter:
+                result = await scrape_url_for_content_async(session, url, cache=cache, iframe_memo=iframe_memo,
+                                                            rate_limiter=rate_limiter, metrics=metrics,
+                                                            parse_pool=parse_pool)
+                progress.add(result)
+                if sink:
+                    await _off_loop(sink, url, result, executor=writer)
+                else:
+                    results[url] = result
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(max_concurrency)))
+        finally:
+            if writer:
+                writer.shutdown()
+        print(f"   📊 {iframe_memo.summary()}")
+        return results
+
+
+def scrape_urls_for_content_async(urls, max_concurrency=200, per_host_limit=16, cache=None,
+                                  rate_limiter=None, sink=None, metrics=None, parse_workers=None):
+    """Scrape multiple URLs for forms and iframes on a single asyncio event loop"""
+    total = len(urls) if hasattr(urls, '__len__') else None
+    print(f"🕷️  Starting form and iframe detection for {total if total is not None else 'streamed'} URLs...")
+    print(f"   Using asyncio engine ({max_concurrency} max in flight, {per_host_limit} per host)...")
+
+    progress = ScrapeProgress(total)
+    # The event loop only does network I/O; HTML is parsed in worker processes
+    parse_processes = parse_pool_size(parse_workers)
+    parse_pool = create_parse_pool(parse_processes)
+    if parse_pool:
+        print(f"   Parsing HTML in {parse_processes} worker processes...")
+    try:
+        results = asyncio.run(_scrape_all(urls, max_concurrency, per_host_limit, cache, rate_limiter, sink, progress,
+                                          metrics, parse_pool))
+    finally:
+        if parse_pool:
+            parse_pool.shutdown()
+
+    progress.report()
+    if cache:
+        print(f"   📊 {cache.summary()}")
+    if rate_limiter:
+        print(f"   📊 {rate_limiter.summary()}")
+    return results
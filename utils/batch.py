@@ -0,0 +1,56 @@
+import json
+import os
+import re
+
+# site-urls.json / inventory.json, or site-urls-<customer>.json / inventory-<customer>.json
+SITE_URLS_PATTERN = re.compile(r'^site-urls(?P<suffix>-.+)?\.json$')
+
+
+def inventory_for(site_urls_path):
+    """The inventory file paired with a site-urls file (same folder, same suffix)"""
+    folder, name = os.path.split(site_urls_path)
+    match = SITE_URLS_PATTERN.match(name)
+    if not match:
+        raise ValueError(f"Not a site-urls file: {site_urls_path}")
+    return os.path.join(folder, f"inventory{match.group('suffix') or ''}.json")
+
+
+def find_site_pairs(paths):
+    """Expand site-urls files, folders and explicit SITE:INVENTORY pairs into (site, inventory) paths
+
+    Folders contribute every site-urls*.json they contain. Site-urls files
+    without a matching inventory file, and paths that are neither a folder, a
+    site-urls file nor a pair, are reported and skipped so the rest of the
+    batch still runs.
+    """
+    pairs = []
+    for path in paths:
+        if os.path.isdir(path):
+            site_paths = [os.path.join(path, name) for name in sorted(os.listdir(path))
+                          if SITE_URLS_PATTERN.match(name)]
+        elif ':' in path and not os.path.exists(path):
+            site_path, inventory_path = path.split(':', 1)
+            pairs.append((site_path, inventory_path))
+            continue
+        else:
+            site_paths = [path]
+        for site_path in site_paths:
+            try:
+                inventory_path = inventory_for(site_path)
+            except ValueError as e:
+                print(f"⚠️ Skipping {site_path}: {e} (expected site-urls[-<name>].json or SITE:INVENTORY)")
+                continue
+            if os.path.exists(inventory_path):
+                pairs.append((site_path, inventory_path))
+            else:
+                print(f"⚠️ Skipping {site_path}: no {os.path.basename(inventory_path)} next to it")
+    # The same pair named twice (e.g. a folder and one of its files) runs once
+    return list(dict.fromkeys(pairs))
+
+
+def load_site(site_urls_path):
+    """Return (customer name, domain, urls) from a site-urls file"""
+    with open(site_urls_path) as f:
+        site_data = json.load(f)
+    domain = site_data.get('originUrl', '').split('//')[-1].split('/')[0]
+    return site_data.get('customerName', 'Unknown Customer'), domain, site_data.get('urls', [])
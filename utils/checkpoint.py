@@ -0,0 +1,71 @@
+import json
+import os
+import time
+from utils.scrape_result import ScrapeResult
+
+
+def checkpoint_path(domain, folder='.checkpoints'):
+    """Journal location for a site; kept outside the customer folder, which is rebuilt each run"""
+    return os.path.join(folder, f"{domain}.scrape.jsonl")
+
+
+class CheckpointJournal:
+    """Append-only JSONL journal of completed scrape results
+
+    Each finished URL is written as one line and flushed immediately; the file
+    is fsynced every `fsync_every` records or `fsync_interval` seconds, so a
+    crashed run loses at most the last few results.
+    """
+
+    def __init__(self, path, fsync_every=50, fsync_interval=5.0):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def load(self):
+        """Return {url: result} for every complete record in an existing journal"""
+        results = {}
+        if not os.path.exists(self.path):
+            return results
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash; everything before it is intact
+                    continue
+                results[record['url']] = ScrapeResult.from_dict(record['result'])
+        return results
+
+    def open(self, resume=False):
+        """Open for appending (resume) or start a fresh journal"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        return self
+
+    def record(self, url, result):
+        self._file.write(json.dumps({'url': url, 'result': result.to_dict()}) + '\n')
+        self._file.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self._sync()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._file:
+            self._sync()
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """Delete the journal once its run has completed"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
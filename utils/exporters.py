@@ -0,0 +1,185 @@
+import os
+
+# Excel's hard sheet limit, header row included
+EXCEL_MAX_ROWS = 1048576
+# Overflowing exports get one sheet per group only while the groups stay manageable
+MAX_GROUP_SHEETS = 250
+# Rows converted from the DataFrame at a time, so the copy made for writing stays small
+EXPORT_CHUNK_ROWS = 50000
+
+EXPORT_FORMATS = ('xlsx', 'csv', 'parquet')
+
+INVALID_SHEET_CHARS = str.maketrans({c: '_' for c in '[]:*?/\\'})
+
+
+def iter_rows(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield DataFrame rows as tuples of plain Python values (missing values as None)"""
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        missing = chunk.isna()
+        if missing.values.any():
+            chunk = chunk.astype(object).where(~missing, None)
+        yield from chunk.itertuples(index=False, name=None)
+
+
+def sheet_title(name, used):
+    """Excel-safe, unique sheet title (at most 31 characters)"""
+    base = (str(name) or 'Ungrouped').translate(INVALID_SHEET_CHARS)[:31]
+    title = base
+    suffix = 2
+    while title.lower() in used:
+        tag = f" ({suffix})"
+        title = base[:31 - len(tag)] + tag
+        suffix += 1
+    used.add(title.lower())
+    return title
+
+
+def labeled_frame(df, labels):
+    """df with its integer-coded columns shown as their labels, without building a string per row
+
+    `labels` maps column names to arrays of strings indexed by the column's
+    values. Those columns become categoricals over the label arrays, so only
+    the codes are new memory; strings are produced chunk by chunk as the rows
+    are written.
+    """
+    import pandas as pd
+
+    columns = {}
+    for column in df.columns:
+        if column in labels:
+            label_codes, categories = pd.factorize(labels[column])
+            columns[column] = pd.Categorical.from_codes(label_codes[df[column].to_numpy()], categories=categories)
+        else:
+            columns[column] = df[column]
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def plan_sheets(df, split_by=None, max_rows=EXCEL_MAX_ROWS):
+    """Split a DataFrame into [(sheet name, rows)] so no sheet exceeds Excel's row limit
+
+    Everything goes to one "Sheet1" when it fits. Otherwise rows are split per
+    `split_by` value (one sheet per group) when that column is given and has at
+    most MAX_GROUP_SHEETS values, and any sheet still too large continues on
+    numbered sheets.
+    """
+    data_rows = max_rows - 1
+    if len(df) <= data_rows:
+        return [('Sheet1', df)]
+
+    if split_by is not None and df[split_by].nunique(dropna=False) <= MAX_GROUP_SHEETS:
+        # observed=True so a categorical split column yields no empty sheets on pandas < 3
+        groups = df.groupby(split_by, sort=False, dropna=False, observed=True)
+        parts = [(value or 'Ungrouped', rows) for value, rows in groups]
+    else:
+        parts = [('Sheet', df)]
+
+    sheets = []
+    for name, rows in parts:
+        for part, start in enumerate(range(0, len(rows), data_rows), start=1):
+            label = name if len(rows) <= data_rows else f"{name} {part}"
+            sheets.append((label, rows.iloc[start:start + data_rows]))
+    return sheets
+
+
+def write_xlsx(df, path, split_by=None, max_rows=EXCEL_MAX_ROWS):
+    """Stream a DataFrame to XLSX with openpyxl's write-only mode
+
+    Rows are written as they are converted instead of building the whole
+    worksheet in memory, and exports past Excel's row limit are split across
+    sheets (see plan_sheets). Returns the sheet names written.
+    """
+    # openpyxl is only imported once an Excel file is written
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+
+    # Same header look as DataFrame.to_excel()
+    thin = Side(style='thin')
+    header_font = Font(bold=True)
+    header_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    header_alignment = Alignment(horizontal='center', vertical='top')
+    workbook = Workbook(write_only=True)
+    used = set()
+    titles = []
+    for name, rows in plan_sheets(df, split_by=split_by, max_rows=max_rows):
+        sheet = workbook.create_sheet(sheet_title(name, used))
+        header = []
+        for column in df.columns:
+            cell = WriteOnlyCell(sheet, value=str(column))
+            cell.font = header_font
+            cell.border = header_border
+            cell.alignment = header_alignment
+            header.append(cell)
+        sheet.append(header)
+        for row in iter_rows(rows):
+            sheet.append(row)
+        titles.append(sheet.title)
+    workbook.save(path)
+    return titles
+
+
+def write_csv(df, path):
+    df.to_csv(path, index=False)
+
+
+def write_parquet(df, path):
+    df.to_parquet(path, index=False)
+
+
+WRITERS = {
+    'xlsx': write_xlsx,
+    'csv': write_csv,
+    'parquet': write_parquet,
+}
+
+
+def export_dataframe(df, path, formats=('xlsx',), split_by=None, labels=None):
+    """Write a DataFrame in each requested format next to `path`; returns the files written
+
+    `path` names the export without regard to format (its extension is
+    replaced per format). Formats whose optional dependency is missing (Parquet
+    needs pyarrow or fastparquet) are skipped with a warning. Integer-coded
+    columns named in `labels` are written as their labels (see labeled_frame).
+    """
+    unknown = [fmt for fmt in formats if fmt not in WRITERS]
+    if unknown:
+        raise ValueError(f"Unknown export format(s): {', '.join(unknown)} (choose from {', '.join(EXPORT_FORMATS)})")
+
+    if labels:
+        df = labeled_frame(df, labels)
+    base = os.path.splitext(path)[0]
+    written = []
+    for fmt in dict.fromkeys(formats):
+        out_path = f"{base}.{fmt}"
+        try:
+            if fmt == 'xlsx':
+                sheets = write_xlsx(df, out_path, split_by=split_by)
+                if len(sheets) > 1:
+                    print(f"   📄 {len(df)} rows exceed Excel's sheet limit; split across {len(sheets)} sheets")
+            else:
+                WRITERS[fmt](df, out_path)
+        except ImportError as e:
+            print(f"⚠️ Skipping {fmt} export: {e}")
+            continue
+        written.append(out_path)
+    return written
+
+
+def read_export(path):
+    """Load an export written by export_dataframe back into one DataFrame
+
+    Sheets of a split Excel export are concatenated in order, and empty cells
+    read back as empty strings, as they were written.
+    """
+    import pandas as pd
+
+    fmt = os.path.splitext(path)[1].lstrip('.').lower()
+    if fmt == 'xlsx':
+        sheets = pd.read_excel(path, sheet_name=None, keep_default_na=False)
+        return pd.concat(sheets.values(), ignore_index=True)
+    if fmt == 'csv':
+        return pd.read_csv(path, keep_default_na=False)
+    if fmt == 'parquet':
+        return pd.read_parquet(path)
+    raise ValueError(f"Unknown export format: {path} (choose from {', '.join(EXPORT_FORMATS)})")
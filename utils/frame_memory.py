@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+# Text columns become categoricals when at most this share of their values are distinct
+CATEGORY_MAX_RATIO = 0.5
+# Smallest nullable integer dtype holding each count column's largest value
+_INT_DTYPES = [(np.iinfo(np.int8).max, 'Int8'), (np.iinfo(np.int16).max, 'Int16'),
+               (np.iinfo(np.int32).max, 'Int32')]
+
+
+def compact_column(series):
+    """Same values in a smaller dtype: categorical text and the smallest nullable int for counts
+
+    Flag columns stay numpy bool: they already take one byte per row, and
+    exporters write them as TRUE/FALSE (the nullable 'boolean' dtype comes
+    out of the XLSX writer as 0/1).
+    """
+    dtype = series.dtype
+    if pd.api.types.is_integer_dtype(dtype):
+        largest = max(abs(int(series.max())), abs(int(series.min()))) if len(series) else 0
+        return series.astype(next((name for bound, name in _INT_DTYPES if largest <= bound), 'Int64'))
+    if (pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype)) and len(series):
+        if series.nunique(dropna=False) <= len(series) * CATEGORY_MAX_RATIO:
+            return series.astype('category')
+    return series
+
+
+def compact_frame(df, keep=()):
+    """Copy of df with every column except `keep` in its compact dtype (see compact_column)"""
+    return df.assign(**{column: compact_column(df[column]) for column in df.columns if column not in keep})
+
+
+def memory_report(df):
+    """Bytes used by each column (string contents included), largest first"""
+    usage = df.memory_usage(index=False, deep=True).sort_values(ascending=False)
+    return {column: int(size) for column, size in usage.items()}
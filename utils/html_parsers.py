@@ -0,0 +1,154 @@
+import threading
+from collections import namedtuple
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+except ImportError:  # the BeautifulSoup backend is always available
+    etree = None
+
+# Only the attributes the form/iframe classifier needs
+FormInfo = namedtuple('FormInfo', ['method', 'action', 'form_id', 'input_count', 'input_types', 'mentions_search'])
+IframeInfo = namedtuple('IframeInfo', ['src', 'iframe_id', 'title', 'width', 'height'])
+
+INPUT_TAGS = ('input', 'textarea', 'select')
+
+
+class BeautifulSoupParser:
+    """Reference backend: full html.parser tree, matching the original scraper exactly"""
+
+    name = 'bs4'
+
+    def extract(self, html):
+        soup = BeautifulSoup(html, 'html.parser')
+        forms = []
+        for form in soup.find_all('form'):
+            inputs = form.find_all(list(INPUT_TAGS))
+            forms.append(FormInfo(
+                method=form.get('method', 'GET'),
+                action=form.get('action', ''),
+                form_id=form.get('id', ''),
+                input_count=len(inputs),
+                input_types=[inp.get('type', 'text') for inp in form.find_all('input')],
+                mentions_search='search' in str(form).lower(),
+            ))
+        iframes = [
+            IframeInfo(
+                src=iframe.get('src', ''),
+                iframe_id=iframe.get('id', ''),
+                title=iframe.get('title', ''),
+                width=iframe.get('width', ''),
+                height=iframe.get('height', ''),
+            )
+            for iframe in soup.find_all('iframe')
+        ]
+        return forms, iframes
+
+    def count_forms(self, html):
+        return len(BeautifulSoup(html, 'html.parser').find_all('form'))
+
+
+class LxmlParser:
+    """Fast libxml2-backed backend that reads attributes without re-serializing subtrees
+
+    Matches the BeautifulSoup backend on well-formed pages (see
+    tests/test_parser_parity.py), not on every malformed one.
+    """
+
+    name = 'lxml'
+
+    def __init__(self):
+        # libxml2 parser objects must not be shared between threads
+        self._local = threading.local()
+
+    def _root(self, html):
+        parser = getattr(self._local, 'parser', None)
+        if parser is None:
+            parser = self._local.parser = etree.HTMLParser()
+        try:
+            return etree.fromstring(html, parser)
+        except (etree.ParserError, ValueError):
+            return None
+
+    def extract(self, html):
+        root = self._root(html)
+        if root is None:
+            return [], []
+        forms = []
+        for form in root.iter('form'):
+            input_count = 0
+            input_types = []
+            for inp in form.iter(INPUT_TAGS):
+                input_count += 1
+                if inp.tag == 'input':
+                    input_types.append(inp.get('type', 'text'))
+            forms.append(FormInfo(
+                method=form.get('method', 'GET'),
+                action=form.get('action', ''),
+                form_id=form.get('id', ''),
+                input_count=input_count,
+                input_types=input_types,
+                mentions_search=_mentions_search(form),
+            ))
+        iframes = [
+            IframeInfo(
+                src=iframe.get('src', ''),
+                iframe_id=iframe.get('id', ''),
+                title=iframe.get('title', ''),
+                width=iframe.get('width', ''),
+                height=iframe.get('height', ''),
+            )
+            for iframe in root.iter('iframe')
+        ]
+        return forms, iframes
+
+    def count_forms(self, html):
+        root = self._root(html)
+        return 0 if root is None else sum(1 for _ in root.iter('form'))
+
+
+def _mentions_search(form):
+    """True if 'search' appears in the form's markup (tags, attributes, text or comments)"""
+    for el in form.iter():
+        if isinstance(el.tag, str) and 'search' in el.tag.lower():
+            return True
+        for key, value in el.attrib.items():
+            if 'search' in key.lower() or 'search' in value.lower():
+                return True
+        if el.text and 'search' in el.text.lower():
+            return True
+        if el is not form and el.tail and 'search' in el.tail.lower():
+            return True
+    return False
+
+
+PARSERS = {'bs4': BeautifulSoupParser}
+if etree is not None:
+    PARSERS['lxml'] = LxmlParser
+
+# BeautifulSoup stays the default: lxml is faster, but libxml2 repairs malformed markup (unclosed or
+# nested forms) differently from html.parser, so its form counts and types can differ on broken pages.
+# Select lxml explicitly (process_urls(html_parser='lxml')) when the speed matters more.
+_default_parser = 'bs4'
+_instances = {}
+
+
+def set_default_parser(name):
+    """Select the backend used when no parser is passed explicitly"""
+    global _default_parser
+    if name not in PARSERS:
+        raise ValueError(f"Unknown HTML parser backend '{name}' (available: {', '.join(PARSERS)})")
+    _default_parser = name
+
+
+def default_parser_name():
+    return _default_parser
+
+
+def get_parser(name=None):
+    name = name or _default_parser
+    if name not in _instances:
+        if name not in PARSERS:
+            raise ValueError(f"Unknown HTML parser backend '{name}' (available: {', '.join(PARSERS)})")
+        _instances[name] = PARSERS[name]()
+    return _instances[name]
@@ -0,0 +1,107 @@
+import socket
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from utils.page_content import REQUEST_HEADERS
+
+
+def count_origins(urls):
+    """Return (origin, url_count) pairs ordered by how many URLs each origin has"""
+    origins = Counter()
+    for url in urls:
+        parts = urlsplit(url)
+        if parts.scheme in ('http', 'https') and parts.netloc:
+            origins[f"{parts.scheme}://{parts.netloc.lower()}"] += 1
+    return origins.most_common()
+
+
+class HttpSession:
+    """Shared keep-alive session whose connection pools are reused across worker threads"""
+
+    def __init__(self, pool_maxsize=10, pool_connections=100, rate_limiter=None, metrics=None):
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self._session = requests.Session()
+        self._session.headers.update(REQUEST_HEADERS)
+        self._session.verify = False
+        self._adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self._session.mount('http://', self._adapter)
+        self._session.mount('https://', self._adapter)
+
+    def get(self, url, metrics=None, **kwargs):
+        """Same contract as requests.get, over pooled connections and the per-host rate limit
+
+        The fetch is recorded in `metrics` when given, else in the session's own.
+        """
+        if self.rate_limiter:
+            self.rate_limiter.wait(url)
+        kwargs.setdefault('verify', False)
+        metrics = metrics or self.metrics
+        if not metrics:
+            return self._session.get(url, **kwargs)
+        start = time.perf_counter()
+        try:
+            response = self._session.get(url, **kwargs)
+        except Exception:
+            metrics.record_fetch(url, time.perf_counter() - start)
+            raise
+        metrics.record_fetch(url, time.perf_counter() - start, len(response.content), response.status_code)
+        return response
+
+    def metered(self, metrics):
+        """View of this session that records its fetches in `metrics` (one run of several sharing the pool)"""
+        return MeteredSession(self, metrics)
+
+    def warm_up(self, urls, max_hosts=50, timeout=5, max_workers=8):
+        """Pre-resolve and pre-connect to the busiest hosts before scraping starts"""
+        origins = [origin for origin, _ in count_origins(urls)[:max_hosts]]
+
+        def connect(origin):
+            parts = urlsplit(origin)
+            try:
+                socket.getaddrinfo(parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+                # A HEAD request leaves an open keep-alive connection (TLS included) in the pool
+                self._session.head(origin, timeout=timeout, allow_redirects=False)
+                return True
+            except Exception:
+                return False
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            connected = sum(executor.map(connect, origins))
+        print(f"   🔌 Pre-connected to {connected}/{len(origins)} hosts")
+        return connected
+
+    def connection_stats(self):
+        """Requests issued vs. new connections opened across all host pools"""
+        requests_made = 0
+        connections = 0
+        for key in list(self._adapter.poolmanager.pools.keys()):
+            pool = self._adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            requests_made += pool.num_requests
+            connections += pool.num_connections
+        reuse = (1 - connections / requests_made) * 100 if requests_made else 0.0
+        return {'requests': requests_made, 'connections': connections, 'reuse_ratio': reuse}
+
+    def summary(self):
+        stats = self.connection_stats()
+        return (f"Connections: {stats['connections']} opened for {stats['requests']} requests "
+                f"({stats['reuse_ratio']:.1f}% reused)")
+
+    def close(self):
+        self._session.close()
+
+
+class MeteredSession:
+    """An HttpSession's pools and rate limits, with fetches recorded in one run's metrics"""
+
+    def __init__(self, session, metrics):
+        self.session = session
+        self.metrics = metrics
+
+    def get(self, url, **kwargs):
+        return self.session.get(url, metrics=self.metrics, **kwargs)
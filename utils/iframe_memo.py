@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from utils.scrape_cache import normalize_url
+
+
+class IframeMemo:
+    """Per-run memo of iframe form counts with single-flight fetching
+
+    Each distinct iframe URL is fetched once; concurrent lookups for a URL
+    that is already being fetched wait for that fetch instead of repeating it.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._results = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def get(self, iframe_url, fetch):
+        """Return the form count for an iframe URL, calling fetch(iframe_url) at most once"""
+        key = normalize_url(iframe_url)
+        with self._lock:
+            if key in self._results:
+                self.hits += 1
+                return self._results[key]
+            event = self._in_flight.get(key)
+            owner = event is None
+            if owner:
+                event = self._in_flight[key] = threading.Event()
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not owner:
+            event.wait()
+            return self._results.get(key, 0)
+
+        count = 0
+        try:
+            count = fetch(iframe_url)
+        finally:
+            with self._lock:
+                self._results[key] = count
+                del self._in_flight[key]
+            event.set()
+        return count
+
+    async def get_async(self, iframe_url, fetch):
+        """Event-loop variant of get(); fetch(iframe_url) must return an awaitable"""
+        key = normalize_url(iframe_url)
+        if key in self._results:
+            self.hits += 1
+            return self._results[key]
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.hits += 1
+            try:
+                return await asyncio.shield(pending)
+            except Exception:
+                return 0
+
+        self.misses += 1
+        pending = self._in_flight[key] = asyncio.ensure_future(fetch(iframe_url))
+        try:
+            count = await asyncio.shield(pending)
+        except Exception:
+            count = 0
+        self._results[key] = count
+        self._in_flight.pop(key, None)
+        return count
+
+    def summary(self):
+        total = self.hits + self.misses
+        rate = (self.hits / total) * 100 if total else 0.0
+        return (f"Iframes: {self.misses} distinct fetched, {self.hits} lookups reused "
+                f"({rate:.1f}% hit rate)")
@@ -0,0 +1,72 @@
+import json
+from utils.template_index import TemplateIndex
+
+try:
+    import ijson
+except ImportError:  # fall back to json.load when the streaming parser is unavailable
+    ijson = None
+
+
+class Inventory:
+    """Lazy, streaming view over an inventory.json file
+
+    Only blocks[*].name and blocks[*].instances[*].url are read to build the
+    template index, so peak memory depends on the number of URLs rather than
+    on the file size. Fragments and outliers are parsed only when accessed.
+    """
+
+    def __init__(self, path="inventory.json"):
+        self.path = path
+        self._template_index = None
+        self._fragments = None
+        self._outliers = None
+
+    @property
+    def template_index(self):
+        if self._template_index is None:
+            self._template_index = self._build_template_index()
+        return self._template_index
+
+    @property
+    def fragments(self):
+        if self._fragments is None:
+            self._fragments = self._load_section("fragments")
+        return self._fragments
+
+    @property
+    def outliers(self):
+        if self._outliers is None:
+            self._outliers = self._load_section("outliers")
+        return self._outliers
+
+    def _build_template_index(self):
+        if ijson is None:
+            with open(self.path) as f:
+                return TemplateIndex.from_blocks(json.load(f).get("blocks", []))
+
+        index = TemplateIndex()
+        name = None
+        pending_urls = []  # instance URLs seen before the block's name key
+        with open(self.path, "rb") as f:
+            for prefix, event, value in ijson.parse(f):
+                if prefix == "blocks.item.instances.item.url":
+                    if name is None:
+                        pending_urls.append(value)
+                    else:
+                        index.add(value, name)
+                elif prefix == "blocks.item.name":
+                    name = value
+                    for url in pending_urls:
+                        index.add(url, name)
+                    pending_urls = []
+                elif prefix == "blocks.item" and event in ("start_map", "end_map"):
+                    name = None
+                    pending_urls = []
+        return index
+
+    def _load_section(self, key):
+        if ijson is None:
+            with open(self.path) as f:
+                return json.load(f).get(key, [])
+        with open(self.path, "rb") as f:
+            return list(ijson.items(f, f"{key}.item", use_float=True))
@@ -0,0 +1,173 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+# Stages process_urls reports, in run order (also the choices for --profile-stage)
+PIPELINE_STAGES = ('load', 'scrape', 'features', 'grouping', 'templates', 'sort', 'report', 'export')
+# Upper bounds (seconds) of the per-host fetch latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0)
+# Functions listed in metrics.json for a profiled stage
+PROFILE_TOP_FUNCTIONS = 25
+
+# Serializes starting tracemalloc, which is process-wide, between runs
+_tracing_lock = threading.Lock()
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return round(peak / 2**20 if sys.platform == 'darwin' else peak / 2**10, 1)
+
+
+def current_rss_mb():
+    """Resident set size of this process right now (None where /proc is not available)"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return round(resident_pages * os.sysconf('SC_PAGE_SIZE') / 2**20, 1)
+
+
+def _bucket_labels():
+    labels = [f"<={bound}s" for bound in LATENCY_BUCKETS]
+    return labels + [f">{LATENCY_BUCKETS[-1]}s"]
+
+
+class RunMetrics:
+    """Stage timings, memory and fetch statistics for one process_urls run
+
+    Stages are measured with `with metrics.stage(name):` (wall time, CPU time,
+    RSS when the stage ends and, with trace_memory, the tracemalloc peak of
+    the stage's allocations); the process peak RSS is recorded once for the
+    run. tracemalloc is process-wide, so a stage is only traced when nothing
+    else is tracing at the time, and concurrent runs (batch mode) must not
+    trace at all. Fetches are reported through record_fetch() from any
+    thread or the event loop, and DataFrame memory per column through
+    record_frame(). `profile_stage` names one stage to run under cProfile.
+    Everything is written as metrics.json by write().
+    """
+
+    def __init__(self, trace_memory=False, profile_stage=None):
+        self.trace_memory = trace_memory
+        self.profile_stage = profile_stage
+        self.stages = {}
+        self.hosts = {}
+        self.frames = {}
+        self._profile = None
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        profiler = cProfile.Profile() if name == self.profile_stage else None
+        traced = self.trace_memory and self._start_tracing(name)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+                self._profile = profiler
+            stats = {
+                'wall_s': round(time.perf_counter() - wall_start, 4),
+                'cpu_s': round(time.process_time() - cpu_start, 4),
+                'rss_mb': current_rss_mb(),
+            }
+            if traced:
+                stats['peak_alloc_mb'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+                tracemalloc.stop()
+            self.stages[name] = stats
+
+    def _start_tracing(self, name):
+        """Start tracemalloc for one stage; False (with a warning) if something else is already tracing"""
+        with _tracing_lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                return True
+        print(f"⚠️  tracemalloc is already in use in this process; not tracing the {name} stage")
+        return False
+
+    def record_fetch(self, url, seconds, nbytes=0, status=None):
+        """Add one HTTP fetch (status None for a failed request) to its host's statistics"""
+        host = urlsplit(url).netloc.lower()
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound), len(LATENCY_BUCKETS))
+        with self._lock:
+            stats = self.hosts.get(host)
+            if stats is None:
+                stats = self.hosts[host] = {'requests': 0, 'errors': 0, 'bytes': 0, 'total_s': 0.0,
+                                            'max_s': 0.0, 'latency': [0] * (len(LATENCY_BUCKETS) + 1)}
+            stats['requests'] += 1
+            stats['bytes'] += nbytes
+            stats['total_s'] += seconds
+            stats['max_s'] = max(stats['max_s'], seconds)
+            stats['latency'][bucket] += 1
+            if status is None or status >= 400:
+                stats['errors'] += 1
+
+    def record_frame(self, name, columns):
+        """Per-column memory (bytes, from frame_memory.memory_report) of one of the run's DataFrames"""
+        self.frames[name] = {'total_mb': round(sum(columns.values()) / 2**20, 2),
+                             'columns_mb': {column: round(size / 2**20, 3) for column, size in columns.items()}}
+
+    def to_dict(self):
+        labels = _bucket_labels()
+        hosts = {}
+        for host, stats in sorted(self.hosts.items(), key=lambda item: -item[1]['requests']):
+            hosts[host] = {
+                'requests': stats['requests'],
+                'errors': stats['errors'],
+                'bytes': stats['bytes'],
+                'mean_s': round(stats['total_s'] / stats['requests'], 4),
+                'max_s': round(stats['max_s'], 4),
+                'latency_histogram': dict(zip(labels, stats['latency'])),
+            }
+        return {
+            'total_wall_s': round(time.perf_counter() - self._started, 4),
+            'peak_rss_mb': peak_rss_mb(),
+            'stages': self.stages,
+            'frame_memory': self.frames,
+            'fetches': {
+                'requests': sum(h['requests'] for h in hosts.values()),
+                'bytes_downloaded': sum(h['bytes'] for h in hosts.values()),
+                'hosts': hosts,
+            },
+        }
+
+    def write(self, folder):
+        """Write metrics.json (and the profiled stage's .prof file) into `folder`; returns the path"""
+        data = self.to_dict()
+        if self._profile:
+            profile_path = os.path.join(folder, f"profile-{self.profile_stage}.prof")
+            self._profile.dump_stats(profile_path)
+            summary = io.StringIO()
+            pstats.Stats(self._profile, stream=summary).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+            data['profile'] = {
+                'stage': self.profile_stage,
+                'path': profile_path,
+                'top_functions': [line for line in summary.getvalue().splitlines() if line.strip()],
+            }
+        path = os.path.join(folder, 'metrics.json')
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+        return path
+
+    def summary(self):
+        slowest = max(self.stages.items(), key=lambda item: item[1]['wall_s'], default=None)
+        fetched = self.to_dict()['fetches']
+        text = f"Metrics: {fetched['requests']} fetches, {fetched['bytes_downloaded'] / 2**20:.1f} MB downloaded"
+        if slowest:
+            text += f", slowest stage {slowest[0]} ({slowest[1]['wall_s']:.1f}s)"
+        return text
@@ -0,0 +1,186 @@
+import requests
+from urllib.parse import urljoin
+from utils.html_parsers import PARSERS, get_parser
+from utils.scrape_result import ScrapeResult, NO_CONTENT
+
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+def parse_page_content(url, html, parser=None):
+    """Parse a page's forms and iframes without fetching the iframe sources"""
+    forms, iframe_infos = get_parser(parser).extract(html)
+    
+    # Process forms
+    form_details = []
+    form_types = set()
+    
+    for form in forms:
+        method = form.method.upper()
+        action = form.action
+        form_id = form.form_id
+        input_types = form.input_types
+        
+        # Determine form type based on inputs and attributes
+        if form.mentions_search:
+            form_types.add('Search')
+        elif any(inp_type in ['email', 'password'] for inp_type in input_types):
+            form_types.add('Login/Registration')
+        elif any(inp_type in ['email'] for inp_type in input_types) and form.input_count <= 3:
+            form_types.add('Newsletter')
+        elif form.input_count >= 4:
+            form_types.add('Contact/Lead')
+        else:
+            form_types.add('Other')
+        
+        form_detail = f"{method} form"
+        if action:
+            form_detail += f" (action: {action[:50]}{'...' if len(action) > 50 else ''})"
+        if form_id:
+            form_detail += f" (id: {form_id})"
+        
+        form_details.append(form_detail)
+    
+    iframes = []
+    for iframe in iframe_infos:
+        iframes.append({
+            'src': iframe.src,
+            'fetch_url': get_iframe_fetch_url(url, iframe.src),
+            'id': iframe.iframe_id,
+            'title': iframe.title,
+            'width': iframe.width,
+            'height': iframe.height,
+        })
+    
+    return {
+        'form_count': len(forms),
+        'form_types': form_types,
+        'form_details': form_details,
+        'iframes': iframes,
+    }
+
+def get_iframe_fetch_url(page_url, src):
+    """Resolve an iframe src to a fetchable HTTP(S) URL, or None if it should not be scraped"""
+    if not src:
+        return None
+    # Normalize URL for iframe scraping
+    iframe_url = src
+    if src.startswith('//'):
+        iframe_url = 'https:' + src
+    elif src.startswith('/'):
+        # Relative URL - construct full URL from main page
+        iframe_url = urljoin(page_url, src)
+    
+    # Only scrape iframe if it's a valid HTTP(S) URL and not a data URL
+    if iframe_url.startswith(('http://', 'https://')) and 'data:' not in iframe_url:
+        return iframe_url
+    return None
+
+def count_forms(html, parser=None):
+    """Count the forms in an HTML document"""
+    return get_parser(parser).count_forms(html)
+
+def fetch_iframe_form_count(iframe_url, timeout=5, session=None, parse_pool=None):
+    """Fetch an iframe source and count its forms (0 if it can't be scraped)"""
+    http = session or requests
+    try:
+        # Quick check for forms in iframe (shorter timeout)
+        iframe_response = http.get(iframe_url, headers=REQUEST_HEADERS, timeout=timeout, verify=False, allow_redirects=True)
+        iframe_response.raise_for_status()
+        if parse_pool:
+            return parse_pool.submit(count_forms, iframe_response.content).result()
+        return count_forms(iframe_response.content)
+    except:
+        # Silently fail if iframe can't be scraped
+        return 0
+
+def build_content_result(page, iframe_form_counts):
+    """Build the ScrapeResult from a parsed page and its iframe form counts"""
+    # If neither forms nor iframes found
+    if not page['form_count'] and not page['iframes']:
+        return NO_CONTENT
+    
+    # Process iframes and check for forms within them - only track iframes with forms
+    iframe_details = []
+    iframe_sources = set()
+    iframe_forms_found = 0
+    iframe_with_forms = []
+    
+    for iframe in page['iframes']:
+        src = iframe['src']
+        iframe_id = iframe['id']
+        title = iframe['title']
+        width = iframe['width']
+        height = iframe['height']
+        
+        # Only track iframe if it contains forms
+        form_count = iframe_form_counts.get(iframe['fetch_url'], 0) if iframe['fetch_url'] else 0
+        if form_count:
+            iframe_forms_found += form_count
+            iframe_with_forms.append({
+                'url': iframe['fetch_url'],
+                'form_count': form_count,
+                'iframe_id': iframe_id or 'no-id'
+            })
+            
+            # Categorize iframe sources
+            if src:
+                if 'youtube' in src.lower() or 'vimeo' in src.lower():
+                    iframe_sources.add('Video')
+                elif 'google' in src.lower() and 'maps' in src.lower():
+                    iframe_sources.add('Maps')
+                elif 'facebook' in src.lower() or 'twitter' in src.lower() or 'instagram' in src.lower():
+                    iframe_sources.add('Social Media')
+                elif 'recaptcha' in src.lower():
+                    iframe_sources.add('reCAPTCHA')
+                elif src.startswith('//') or src.startswith('http'):
+                    iframe_sources.add('External Content')
+                else:
+                    iframe_sources.add('Internal Content')
+            else:
+                iframe_sources.add('No Source')
+            
+            iframe_detail = "iframe with forms"
+            if src:
+                iframe_detail += f" (src: {src[:50]}{'...' if len(src) > 50 else ''})"
+            if iframe_id:
+                iframe_detail += f" (id: {iframe_id})"
+            if title:
+                iframe_detail += f" (title: {title[:30]}{'...' if len(title) > 30 else ''})"
+            if width and height:
+                iframe_detail += f" ({width}x{height})"
+            iframe_detail += " [FORMS DETECTED]"
+            
+            iframe_details.append(iframe_detail)
+    
+    form_types = page['form_types']
+    form_details = page['form_details']
+    return ScrapeResult(
+        has_forms=page['form_count'] > 0,
+        form_count=page['form_count'],
+        form_types=', '.join(sorted(form_types)) if form_types else '',
+        form_details=' | '.join(form_details) if form_details else '',
+        has_iframes=len(iframe_details) > 0,  # Only count iframes with forms
+        iframe_count=len(iframe_details),      # Only count iframes with forms
+        iframe_sources=', '.join(sorted(iframe_sources)) if iframe_sources else '',
+        iframe_details=' | '.join(iframe_details) if iframe_details else '',
+        iframe_forms_count=iframe_forms_found,
+        iframe_with_forms_count=len(iframe_with_forms),
+        iframe_forms_details=' | '.join([f"{item['url']} ({item['form_count']} forms)" for item in iframe_with_forms]) if iframe_with_forms else '',
+        status='Success'
+    )
+
+
+def check_parser_parity(url, html, iframe_form_counts=None):
+    """Return the backends whose result differs from the BeautifulSoup reference"""
+    iframe_form_counts = iframe_form_counts or {}
+    reference = build_content_result(parse_page_content(url, html, parser='bs4'), iframe_form_counts)
+    return [
+        name for name in PARSERS
+        if build_content_result(parse_page_content(url, html, parser=name), iframe_form_counts) != reference
+    ]
@@ -0,0 +1,32 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from utils.html_parsers import default_parser_name, set_default_parser
+
+
+def available_cores():
+    """CPU cores this process may run on (respects affinity masks / container limits)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def parse_pool_size(workers=None):
+    """Parser processes to start: `workers` if given, else one per core, or 0 (parse inline) on one core"""
+    if workers is not None:
+        return workers
+    cores = available_cores()
+    return cores if cores > 1 else 0
+
+
+def create_parse_pool(workers=None):
+    """Process pool for HTML parsing, or None when parsing should stay in the fetching thread
+
+    Workers receive raw response bytes and return the plain dicts/ints from
+    parse_page_content/count_forms, so no parser objects cross the process
+    boundary. Each worker starts with the parent's default parser backend.
+    """
+    size = parse_pool_size(workers)
+    if size <= 0:
+        return None
+    return ProcessPoolExecutor(max_workers=size, initializer=set_default_parser,
+                               initargs=(default_parser_name(),))
@@ -0,0 +1,115 @@
+class PathTrie:
+    """Prefix tree of URL path segments with a URL count per node
+
+    Every URL is inserted once, by its path (e.g. its pattern). Nodes are
+    numbered in insertion order, so a parent always comes before its children
+    and each grouping query is one or two sweeps over the node arrays. Because
+    the counts are kept per node, the same trie answers queries at any depth
+    without reinserting the URLs.
+    """
+
+    ROOT = 0
+
+    def __init__(self):
+        self.parent = [-1]
+        self.segment = ['']
+        self.depth = [0]
+        self.count = [0]  # URLs whose path ends exactly at this node
+        # Path -> node for every node, so an insert only walks up to its nearest known ancestor
+        self._nodes = {'': self.ROOT}
+
+    def __len__(self):
+        return len(self.count)
+
+    def insert(self, path, count=1):
+        """Add `count` URLs with this '/'-separated path; returns the node id"""
+        node = self._nodes.get(path)
+        if node is None:
+            missing = []
+            while node is None:
+                missing.append(path)
+                path = path.rpartition('/')[0]
+                node = self._nodes.get(path)
+            for path in reversed(missing):
+                parent, node = node, len(self.count)
+                self.parent.append(parent)
+                self.segment.append(path.rpartition('/')[2])
+                self.depth.append(self.depth[parent] + 1)
+                self.count.append(0)
+                self._nodes[path] = node
+        self.count[node] += count
+        return node
+
+    def insert_all(self, paths):
+        """Insert every path; returns the node id of each, in order"""
+        return [self.insert(path) for path in paths]
+
+    def node(self, path):
+        """Node id of an inserted path (None if it was never inserted)"""
+        return self._nodes.get(path)
+
+    def segments(self, node):
+        segments = []
+        while node != self.ROOT:
+            segments.append(self.segment[node])
+            node = self.parent[node]
+        return segments[::-1]
+
+    def path(self, node):
+        return '/'.join(self.segments(node))
+
+    def totals(self):
+        """URLs at or below each node"""
+        totals = list(self.count)
+        for node in range(len(totals) - 1, 0, -1):
+            totals[self.parent[node]] += totals[node]
+        return totals
+
+    def group_nodes(self, min_pages=5, max_depth=None, hierarchical=False, exclude=None):
+        """Map every node to the node its URLs are grouped under (-1 for ungrouped)
+
+        Paths deeper than `max_depth` count towards their ancestor at that
+        depth. A node becomes a group when at least `min_pages` URLs land on it
+        and exclude(segments) is false; excluded nodes never group and keep
+        their URLs ungrouped. With `hierarchical`, URLs of a node that is not a
+        group roll up to its parent, so each URL ends up in the deepest
+        group above it that reaches `min_pages` on its own; nothing rolls up into
+        the root, whose URLs only form a group of their own.
+        """
+        n_nodes = len(self.count)
+        key = list(range(n_nodes))
+        if max_depth is not None:
+            for node in range(1, n_nodes):
+                if self.depth[node] > max_depth:
+                    key[node] = key[self.parent[node]]
+
+        pages = [0] * n_nodes
+        for node in range(n_nodes):
+            pages[key[node]] += self.count[node]
+
+        # Decided bottom-up, so rolled-up URLs count towards their parent before it is looked at
+        grouped = [False] * n_nodes
+        rolled = [False] * n_nodes
+        for node in range(n_nodes - 1, -1, -1):
+            if key[node] != node or not pages[node]:
+                continue
+            rolls_up = hierarchical and node != self.ROOT and self.parent[node] != self.ROOT
+            if pages[node] < min_pages and not rolls_up:
+                continue
+            if exclude and exclude(self.segments(node)):
+                continue
+            if pages[node] >= min_pages:
+                grouped[node] = True
+            else:
+                rolled[node] = True
+                pages[self.parent[node]] += pages[node]
+
+        assigned = [-1] * n_nodes
+        for node in range(n_nodes):
+            if key[node] != node:
+                assigned[node] = assigned[key[node]]
+            elif grouped[node]:
+                assigned[node] = node
+            elif rolled[node]:
+                assigned[node] = assigned[self.parent[node]]
+        return assigned
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` requests per second with bursts of up to `burst`"""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return how long the caller must wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Tokens may go negative: callers queue up behind earlier reservations
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+
+class HostRateLimiter:
+    """Per-host politeness limiter: every host is throttled on its own token bucket"""
+
+    def __init__(self, rate=5.0, burst=5, host_rates=None):
+        self.rate = rate
+        self.burst = burst
+        # hostname -> (requests per second, burst) overrides, e.g. for the main site
+        self.host_rates = {host.lower(): limits for host, limits in (host_rates or {}).items()}
+        self.waited = 0.0
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url):
+        host = (urlsplit(url).hostname or '').lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self.host_rates.get(host, (self.rate, self.burst))
+                bucket = self._buckets[host] = TokenBucket(rate, burst)
+            return bucket
+
+    def _reserve(self, url):
+        delay = self.bucket(url).reserve()
+        if delay:
+            with self._lock:
+                self.waited += delay
+        return delay
+
+    def wait(self, url):
+        """Block until a request to this URL's host is allowed"""
+        delay = self._reserve(url)
+        if delay:
+            time.sleep(delay)
+
+    async def wait_async(self, url):
+        """Event-loop variant of wait()"""
+        delay = self._reserve(url)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def summary(self):
+        return f"Rate limiting: {len(self._buckets)} host buckets, {self.waited:.1f}s total throttle delay"
@@ -0,0 +1,336 @@
+import pandas as pd
+
+
+def _plain(value):
+    """numpy scalar -> plain Python value so the stats serialize to JSON"""
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _value_counts(series):
+    """value_counts() that ranks categorical values like plain ones (ties in first-seen order)
+    and leaves out categories with no rows"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes
+        counts = codes[codes >= 0].value_counts()
+        return pd.Series(counts.to_numpy(), index=series.cat.categories[counts.index.to_numpy()])
+    return series.value_counts()
+
+
+def _distribution(series, labels=None):
+    """[(value, count)] in value_counts() order: count descending, then first seen
+
+    With `labels`, values are integer codes and are reported as labels[value].
+    """
+    counts = _value_counts(series)
+    if labels is not None:
+        return [(labels[value], int(count)) for value, count in counts.items()]
+    return [(_plain(value), int(count)) for value, count in counts.items()]
+
+
+def _ranked_by_key(sizes, labels=None):
+    """Split a (key, value) -> count Series from groupby(sort=False).size() into
+    {key: [(value, count)]}, each list ranked like value_counts() on that key's rows"""
+    ranked = {}
+    for (key, value), count in sizes.items():
+        value = labels[value] if labels is not None else _plain(value)
+        ranked.setdefault(key, []).append((value, int(count)))
+    for key, counts in ranked.items():
+        # sorted() is stable, so ties keep first-seen order like value_counts()
+        counts.sort(key=lambda item: -item[1])
+    return ranked
+
+
+def compute_report_stats(df, min_pattern_pages=5, labels=None):
+    """Compute every statistic of the analysis report in one aggregation stage
+
+    Per-pattern tables come from single groupby passes over the whole frame
+    rather than one filtered slice per group, so the cost grows with rows, not
+    groups x rows. The result is a dict of plain Python values (JSON-ready);
+    distributions are lists of (value, count) pairs in value_counts() order.
+
+    The template columns may hold integer codes (template numbers and
+    signature ids), aggregated as integers; `labels` then maps each column name
+    to an array of its strings, indexed by code.
+    """
+    labels = labels or {}
+    total = len(df)
+    has_forms = df['has_forms'] == True
+    has_iframes = df['has_iframes'] == True
+    no_forms = df['has_forms'] == False
+    no_iframes = df['has_iframes'] == False
+    successful = int((df['scrape_status'] == 'Success').sum())
+
+    content = {
+        'total_pages': total,
+        'pages_with_forms': int(has_forms.sum()),
+        'pages_without_forms': int(no_forms.sum()),
+        'pages_with_iframes': int(has_iframes.sum()),
+        'pages_without_iframes': int(no_iframes.sum()),
+        'pages_with_iframe_forms': int((df['iframe_forms_count'] > 0).sum()),
+        'total_iframe_forms': int(df['iframe_forms_count'].sum()),
+        'pages_with_both': int((has_forms & has_iframes).sum()),
+        'pages_with_neither': int((no_forms & no_iframes).sum()),
+        'successful_scrapes': successful,
+        'failed_scrapes': total - successful,
+    }
+
+    # URL pattern groups ('' is the ungrouped bucket)
+    group_counts = _value_counts(df['group'])
+    ungrouped = df['group'] == ''
+    grouped_pages = int((df['group'] != '').sum())
+    # Matches the report's historical count, which subtracts the ungrouped bucket
+    pattern_count = len(group_counts) - 1
+
+    significant = [(group, int(count)) for group, count in group_counts.items()
+                   if group != '' and count >= min_pattern_pages]
+    significant_rows = df[df['group'].isin([group for group, _ in significant])]
+    # observed=True: group/template may be categoricals (see compact_frame), whose unused
+    # combinations must not show up as empty rows (pandas < 3 defaults to observed=False)
+    templates_by_group = _ranked_by_key(
+        significant_rows.groupby(['group', 'template'], sort=False, observed=True).size(), labels.get('template'))
+    details_by_group = _ranked_by_key(
+        significant_rows.groupby(['group', 'template_details'], sort=False, observed=True).size(),
+        labels.get('template_details'))
+
+    patterns = []
+    template_cross_group = {}
+    for group, count in significant:
+        templates = [(template, n) for template, n in templates_by_group.get(group, []) if template != '']
+        for template, n in templates:
+            template_cross_group.setdefault(template, []).append((group, n))
+        patterns.append({
+            'group': group,
+            'pages': count,
+            'templates': templates,
+            'top_template_details': details_by_group.get(group, [])[:3],
+        })
+
+    cross_pattern_templates = []
+    for template, groups in template_cross_group.items():
+        total_pages = sum(n for _, n in groups)
+        if len(groups) > 1 and total_pages > 5:
+            cross_pattern_templates.append({'template': template, 'total_pages': total_pages, 'patterns': groups})
+    cross_pattern_templates.sort(key=lambda item: item['total_pages'], reverse=True)
+
+    ungrouped_rows = df[ungrouped]
+    ungrouped_details = _distribution(ungrouped_rows['template_details'], labels.get('template_details'))
+
+    return {
+        'content': content,
+        'form_types': _distribution(df.loc[has_forms, 'form_types']),
+        'forms_per_page': sorted(_distribution(df.loc[has_forms, 'form_count'])),
+        'iframe_sources': _distribution(df.loc[has_iframes, 'iframe_sources']),
+        'iframes_per_page': sorted(_distribution(df.loc[has_iframes, 'iframe_count'])),
+        'scrape_status': _distribution(df['scrape_status']),
+        'locales': _distribution(df['locale']),
+        'groups': {
+            'pattern_count': pattern_count,
+            'grouped_pages': grouped_pages,
+            'ungrouped_pages': int(ungrouped.sum()),
+            'average_group_size': grouped_pages / pattern_count if pattern_count > 0 else 0,
+        },
+        'patterns': patterns,
+        'cross_pattern_templates': cross_pattern_templates,
+        'ungrouped': {
+            'templates': [(t, n) for t, n in _distribution(ungrouped_rows['template'], labels.get('template')) if t != ''],
+            'unique_template_details': len(ungrouped_details),
+            'top_template_details': ungrouped_details[:5],
+        },
+        'template_types': int(df['template'].nunique(dropna=False)),
+        'template_combinations': int(df['template_details'].nunique(dropna=False)),
+    }
+
+
+def _pct(part, whole):
+    return (part / whole) * 100
+
+
+def write_report(f, stats, customer_name, domain):
+    """Render precomputed report stats as the text analysis report"""
+    content = stats['content']
+    total = content['total_pages']
+    groups = stats['groups']
+
+    f.write("=" * 80 + "\n")
+    f.write("URL PATTERN GROUPER ANALYSIS REPORT\n")
+    f.write("=" * 80 + "\n\n")
+
+    # 1. Main site URL and basic info
+    f.write("1. BASIC INFORMATION\n")
+    f.write("-" * 50 + "\n")
+    f.write(f"Customer: {customer_name}\n")
+    f.write(f"Main Site URL: https://{domain}\n")
+    f.write(f"Total Pages Analyzed: {total}\n")
+    f.write(f"Analysis Date: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+
+    # 2. Form and Iframe Analysis
+    f.write("2. FORM & IFRAME DETECTION ANALYSIS\n")
+    f.write("   (Only tracking iframes that contain forms)\n")
+    f.write("-" * 50 + "\n")
+    f.write(f"Total Pages Scraped: {total}\n")
+    f.write(f"Successful Scrapes: {content['successful_scrapes']} ({_pct(content['successful_scrapes'], total):.1f}%)\n")
+    f.write(f"Failed Scrapes: {content['failed_scrapes']} ({_pct(content['failed_scrapes'], total):.1f}%)\n\n")
+
+    f.write("FORM ANALYSIS:\n")
+    f.write(f"Pages with Forms: {content['pages_with_forms']} ({_pct(content['pages_with_forms'], total):.1f}%)\n")
+    f.write(f"Pages without Forms: {content['pages_without_forms']} ({_pct(content['pages_without_forms'], total):.1f}%)\n\n")
+
+    f.write("IFRAME ANALYSIS (Only Iframes with Forms):\n")
+    f.write(f"Pages with Iframes containing Forms: {content['pages_with_iframes']} ({_pct(content['pages_with_iframes'], total):.1f}%)\n")
+    f.write(f"Pages without Iframes containing Forms: {content['pages_without_iframes']} ({_pct(content['pages_without_iframes'], total):.1f}%)\n")
+    f.write(f"Pages with Forms in Iframes: {content['pages_with_iframe_forms']} ({_pct(content['pages_with_iframe_forms'], total):.1f}%)\n")
+    f.write(f"Total Forms Found in Iframes: {content['total_iframe_forms']}\n\n")
+
+    f.write("COMBINED ANALYSIS:\n")
+    f.write(f"Pages with Both Forms & Iframes: {content['pages_with_both']} ({_pct(content['pages_with_both'], total):.1f}%)\n")
+    f.write(f"Pages with Neither Forms nor Iframes: {content['pages_with_neither']} ({_pct(content['pages_with_neither'], total):.1f}%)\n\n")
+
+    # Form type analysis
+    if content['pages_with_forms'] > 0:
+        f.write("Form Types Distribution:\n")
+        for form_type, count in stats['form_types'][:10]:
+            if form_type:
+                f.write(f"  {form_type}: {count} pages ({_pct(count, content['pages_with_forms']):.1f}%)\n")
+
+        f.write("\nForms per Page Distribution:\n")
+        for count, pages in stats['forms_per_page']:
+            f.write(f"  {count} form{'s' if count != 1 else ''}: {pages} pages ({_pct(pages, content['pages_with_forms']):.1f}%)\n")
+
+    # Iframe type analysis (only iframes with forms)
+    if content['pages_with_iframes'] > 0:
+        f.write("\nIframe Sources Distribution (Only Iframes with Forms):\n")
+        for iframe_source, count in stats['iframe_sources'][:10]:
+            if iframe_source:
+                f.write(f"  {iframe_source}: {count} pages ({_pct(count, content['pages_with_iframes']):.1f}%)\n")
+
+        f.write("\nIframes with Forms per Page Distribution:\n")
+        for count, pages in stats['iframes_per_page']:
+            f.write(f"  {count} iframe{'s' if count != 1 else ''} with forms: {pages} pages ({_pct(pages, content['pages_with_iframes']):.1f}%)\n")
+
+    # Scraping status analysis
+    f.write("\nScraping Status Breakdown:\n")
+    for status, count in stats['scrape_status']:
+        f.write(f"  {status}: {count} pages ({_pct(count, total):.1f}%)\n")
+    f.write("\n")
+
+    # 3. Locale Analysis
+    f.write("3. LOCALE ANALYSIS\n")
+    f.write("-" * 50 + "\n")
+    f.write(f"Total Locales: {len(stats['locales'])}\n")
+    for locale, count in stats['locales']:
+        f.write(f"  {locale.upper()}: {count} pages ({_pct(count, total):.1f}%)\n")
+    f.write("\n")
+
+    # 4. Similar URL Pattern Analysis
+    f.write("4. SIMILAR URL PATTERN ANALYSIS\n")
+    f.write("-" * 50 + "\n")
+    f.write(f"Total URL Patterns Created: {groups['pattern_count']}\n")
+    f.write(f"Grouped Pages: {groups['grouped_pages']} ({_pct(groups['grouped_pages'], total):.1f}%)\n")
+    f.write(f"Ungrouped Pages: {groups['ungrouped_pages']} ({_pct(groups['ungrouped_pages'], total):.1f}%)\n\n")
+
+    # 5. Detailed URL Pattern Analysis with Templates
+    f.write("5. DETAILED URL PATTERN BREAKDOWN\n")
+    f.write("-" * 50 + "\n")
+    for pattern in stats['patterns']:
+        # Convert "Group 1" to "URL Pattern 1"
+        f.write(f"\n{pattern['group'].replace('Group', 'URL Pattern')}\n")
+        f.write(f"  Total Pages: {pattern['pages']}\n")
+        f.write("  Template Groups:\n")
+        for template, count in pattern['templates']:
+            f.write(f"    {template}: {count} pages\n")
+        f.write("  Top Template Details:\n")
+        for details, count in pattern['top_template_details']:
+            if details and str(details) != 'nan':
+                f.write(f"    \"{details}\": {count} pages\n")
+
+    # 6. Cross-Pattern Template Analysis
+    f.write("\n\n6. CROSS-PATTERN TEMPLATE ANALYSIS\n")
+    f.write("-" * 50 + "\n")
+    f.write("Template groups appearing in multiple URL patterns with >5 pages:\n\n")
+    if stats['cross_pattern_templates']:
+        for item in stats['cross_pattern_templates']:
+            f.write(f"{item['template']} (Total: {item['total_pages']} pages)\n")
+            for group, count in item['patterns']:
+                f.write(f"  - {group.replace('Group', 'URL Pattern')}: {count} pages\n")
+            f.write(f"  INSIGHT: Pages with '{item['template']}' template are similar across {len(item['patterns'])} URL patterns\n\n")
+    else:
+        f.write("No significant cross-pattern template patterns found.\n\n")
+
+    # 7. Ungrouped Pages Analysis
+    f.write("7. UNGROUPED PAGES ANALYSIS\n")
+    f.write("-" * 50 + "\n")
+    f.write(f"Total Ungrouped Pages: {groups['ungrouped_pages']}\n")
+    if groups['ungrouped_pages'] > 0:
+        ungrouped = stats['ungrouped']
+        f.write("Template Groups in Ungrouped Pages:\n")
+        for template, count in ungrouped['templates']:
+            f.write(f"  {template}: {count} pages\n")
+        f.write(f"\nUnique Template Combinations: {ungrouped['unique_template_details']}\n")
+        f.write("Most Common Template Details in Ungrouped Pages:\n")
+        for details, count in ungrouped['top_template_details']:
+            if details and str(details) != 'nan':
+                f.write(f"  \"{details}\": {count} pages\n")
+
+    # 8. Key Insights and Recommendations
+    f.write("\n\n8. KEY INSIGHTS & RECOMMENDATIONS\n")
+    f.write("-" * 50 + "\n")
+    grouping_efficiency = _pct(groups['grouped_pages'], total)
+    f.write(f"• Grouping Efficiency: {grouping_efficiency:.1f}% of pages are grouped\n")
+    f.write(f"• Average Group Size: {groups['average_group_size']:.1f} pages per group\n")
+    f.write(f"• Template Diversity: {stats['template_types']} unique template types\n")
+    f.write(f"• Template Combination Diversity: {stats['template_combinations']} unique combinations\n")
+    f.write(f"• Form Coverage: {_pct(content['pages_with_forms'], total):.1f}% of pages have forms\n")
+    f.write(f"• Iframe with Forms Coverage: {_pct(content['pages_with_iframes'], total):.1f}% of pages have iframes containing forms\n")
+    f.write(f"• Iframe Forms Coverage: {_pct(content['pages_with_iframe_forms'], total):.1f}% of pages have forms within iframes\n")
+    f.write(f"• Total Iframe Forms: {content['total_iframe_forms']} forms found within iframes\n")
+    f.write(f"• Scraping Success Rate: {_pct(content['successful_scrapes'], total):.1f}%\n\n")
+
+    if grouping_efficiency < 50:
+        f.write("⚠️  LOW GROUPING EFFICIENCY: Consider lowering the minimum group size threshold\n")
+    elif grouping_efficiency > 80:
+        f.write("✅ HIGH GROUPING EFFICIENCY: Excellent pattern recognition\n")
+
+    if len(stats['cross_pattern_templates']) > 3:
+        f.write("🔄 HIGH TEMPLATE OVERLAP: Many similar templates across groups - consider template consolidation\n")
+
+    if groups['ungrouped_pages'] > groups['grouped_pages'] * 0.5:
+        f.write("📊 HIGH UNGROUPED DIVERSITY: Many unique pages - good for content variation analysis\n")
+
+    # Most common locales
+    primary_locale, primary_count = stats['locales'][0]
+    f.write(f"🌍 PRIMARY LOCALE: {primary_locale.upper()} ({primary_count} pages)\n")
+    if len(stats['locales']) > 1:
+        f.write(f"🌐 MULTILINGUAL SITE: {len(stats['locales'])} locales detected\n")
+
+    # Content-specific insights
+    if content['pages_with_forms'] > 0:
+        form_conversion_rate = _pct(content['pages_with_forms'], total)
+        if form_conversion_rate > 20:
+            f.write(f"📝 HIGH FORM COVERAGE: {form_conversion_rate:.1f}% of pages have forms - excellent for lead generation\n")
+        elif form_conversion_rate < 5:
+            f.write(f"📝 LOW FORM COVERAGE: Only {form_conversion_rate:.1f}% of pages have forms - consider adding more conversion opportunities\n")
+        else:
+            f.write(f"📝 MODERATE FORM COVERAGE: {form_conversion_rate:.1f}% of pages have forms\n")
+
+    if content['pages_with_iframes'] > 0:
+        iframe_coverage_rate = _pct(content['pages_with_iframes'], total)
+        if iframe_coverage_rate > 30:
+            f.write(f"🖼️  HIGH IFRAME WITH FORMS USAGE: {iframe_coverage_rate:.1f}% of pages have iframes containing forms - embedded conversion opportunities\n")
+        elif iframe_coverage_rate < 10:
+            f.write(f"🖼️  LOW IFRAME WITH FORMS USAGE: Only {iframe_coverage_rate:.1f}% of pages have iframes containing forms\n")
+        else:
+            f.write(f"🖼️  MODERATE IFRAME WITH FORMS USAGE: {iframe_coverage_rate:.1f}% of pages have iframes containing forms\n")
+
+    if content['pages_with_iframe_forms'] > 0:
+        iframe_form_rate = _pct(content['pages_with_iframe_forms'], total)
+        if iframe_form_rate > 10:
+            f.write(f"📝 HIGH IFRAME FORM USAGE: {iframe_form_rate:.1f}% of pages have forms within iframes - embedded conversion opportunities\n")
+        elif iframe_form_rate > 0:
+            f.write(f"📝 IFRAME FORMS DETECTED: {iframe_form_rate:.1f}% of pages have forms within iframes ({content['total_iframe_forms']} total forms)\n")
+
+    if content['failed_scrapes'] > total * 0.1:
+        f.write(f"⚠️  HIGH SCRAPING FAILURE RATE: {_pct(content['failed_scrapes'], total):.1f}% failed - check site accessibility\n")
+
+    f.write("\n" + "=" * 80 + "\n")
+    f.write("END OF ANALYSIS REPORT\n")
+    f.write("=" * 80 + "\n")
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+
+
+def manifest_path(domain, folder='.manifests'):
+    """Manifest location for a site; kept outside the customer folder, which is rebuilt each run"""
+    return os.path.join(folder, f"{domain}.manifest.json")
+
+
+def url_id(entry):
+    """The site-urls.json id hash of an entry (sha1 of the URL when the id is missing)"""
+    return entry.get('id') or hashlib.sha1(entry['url'].encode()).hexdigest()
+
+
+class RunManifest:
+    """Per-site record of the previous run used by incremental mode
+
+    Entries are keyed by URL id hash and hold the URL, its pattern and locale, its
+    template signature (template_details) and its scrape result, so a new run
+    only has to scrape URLs that were added since.
+    """
+
+    def __init__(self, path, entries=None):
+        self.path = path
+        self.entries = entries or {}
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(path, json.load(f).get('entries', {}))
+
+    def diff(self, urls):
+        """Split the current site-urls entries into added/removed/kept URL lists"""
+        current_ids = set()
+        added = []
+        kept = []
+        for entry in urls:
+            entry_id = url_id(entry)
+            current_ids.add(entry_id)
+            if entry_id in self.entries:
+                kept.append(entry['url'])
+            else:
+                added.append(entry['url'])
+        removed = [e['url'] for entry_id, e in self.entries.items() if entry_id not in current_ids]
+        return {'added': added, 'removed': removed, 'kept': kept}
+
+    def previous(self, field):
+        """{url: value} of one stored field for every URL in the previous run that has it"""
+        return {e['url']: e[field] for e in self.entries.values() if e.get(field) is not None}
+
+    def changed(self, urls_df, details_labels=None):
+        """URLs kept from the previous run whose template signature or source changed
+
+        With `details_labels`, template_details holds signature ids that index
+        into it (see url_processor.template_labels).
+        """
+        stored = {e['url']: (e['template_details'], e['source']) for e in self.entries.values()}
+        changed = []
+        for url, details, source in zip(urls_df['url'], urls_df['template_details'], urls_df['source']):
+            if details_labels is not None:
+                details = details_labels[details]
+            previous = stored.get(url)
+            if previous is not None and previous != (details, source):
+                changed.append(url)
+        return changed
+
+    def update(self, urls_df, content_results, details_labels=None):
+        """Replace the entries with the URLs, patterns, templates and results of this run
+
+        `details_labels` maps template_details signature ids to their strings, as in changed().
+        """
+        self.entries = {}
+        for row in urls_df[['url', 'id', 'source', 'pattern', 'locale', 'template_details']].itertuples(index=False):
+            result = content_results.get(row.url)
+            self.entries[row.id] = {
+                'url': row.url,
+                'source': row.source,
+                'pattern': row.pattern,
+                'locale': row.locale,
+                'template_details': (details_labels[row.template_details] if details_labels is not None
+                                     else row.template_details),
+                'result': result.to_dict() if result is not None else None,
+            }
+
+    def save(self):
+        """Write the manifest atomically so an interrupted save keeps the previous one"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'entries': self.entries}, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,158 @@
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+
+
+def iter_bounded(submit, items, max_in_flight):
+    """Start submit(item) (which returns a Future) for items pulled lazily, at most max_in_flight pending
+
+    Yields (item, future) pairs in completion order. New items are only taken
+    from the iterator as slots free up, so memory stays flat however long the
+    input is.
+    """
+    items = iter(items)
+    in_flight = {submit(item): item for item in islice(items, max_in_flight)}
+    while in_flight:
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            item = in_flight.pop(future)
+            for next_item in islice(items, 1):
+                in_flight[submit(next_item)] = next_item
+            yield item, future
+
+
+class _Run:
+    def __init__(self, items, fn, sink):
+        self.pending = deque(items)
+        self.fn = fn
+        self.sink = sink
+        self.remaining = len(self.pending)
+        self.error = None
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        if not self.remaining:
+            self.done.set()
+
+
+class FairScheduler:
+    """One thread pool shared by several concurrent runs, dispatching their items round-robin
+
+    Each run() call registers a run and blocks until all of its items were
+    processed. Runs take turns one item at a time, so a run with a million
+    URLs cannot starve a small one, and at most `max_in_flight` items are
+    submitted to the pool at once.
+    """
+
+    def __init__(self, max_workers=8, max_in_flight=None):
+        self.max_in_flight = max_in_flight or max_workers * 2
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._rotation = deque()
+        self._in_flight = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._dispatcher.start()
+
+    def run(self, items, fn, sink):
+        """Call fn(item) for every item on the shared pool, passing each result to sink(item, result)
+
+        fn may return a Future instead of the result; the item then stays in
+        flight until the future is done. sink calls for one run are
+        serialized. An exception from sink stops the run and is re-raised
+        here; exceptions from fn must be handled by fn.
+        """
+        run = _Run(items, fn, sink)
+        if run.remaining:
+            with self._cond:
+                self._rotation.append(run)
+                self._cond.notify()
+        run.done.wait()
+        if run.error:
+            raise run.error
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                while not self._closed and (self._in_flight >= self.max_in_flight or not self._rotation):
+                    self._cond.wait()
+                if self._closed:
+                    return
+                run = self._rotation.popleft()
+                item = run.pending.popleft()
+                # Back of the line, so every other run gets an item in before this one's next
+                if run.pending and not run.error:
+                    self._rotation.append(run)
+                self._in_flight += 1
+            self._executor.submit(self._process, run, item)
+
+    def submit(self, fn, *args):
+        """Run follow-up work for an item that is already in flight, bypassing the round-robin"""
+        return self._executor.submit(fn, *args)
+
+    def _process(self, run, item):
+        try:
+            result = run.fn(item)
+        except Exception as e:
+            result = None
+            with run.lock:
+                run.error = run.error or e
+            run.done.set()
+        if isinstance(result, Future):
+            result.add_done_callback(lambda future: self._complete(run, item, future.result()))
+        else:
+            self._complete(run, item, result)
+
+    def _complete(self, run, item, result):
+        try:
+            with run.lock:
+                if not run.error:
+                    run.sink(item, result)
+        except Exception as e:
+            with run.lock:
+                run.error = run.error or e
+            run.done.set()
+        finally:
+            with run.lock:
+                run.remaining -= 1
+                if run.remaining == 0:
+                    run.done.set()
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._dispatcher.join()
+        self._executor.shutdown()
+
+
+class ScrapeProgress:
+    """Running completion/success counts with a progress line every `every` URLs"""
+
+    def __init__(self, total=None, every=25, label=None):
+        self.total = total
+        self.every = every
+        self.label = label
+        self.completed = 0
+        self.successful = 0
+
+    def add(self, result):
+        self.completed += 1
+        if result.status == 'Success':
+            self.successful += 1
+
+        # Progress update every 25 URLs
+        if self.completed % self.every == 0:
+            success_rate = (self.successful / self.completed) * 100
+            prefix = f"[{self.label}] " if self.label else ''
+            print(f"  📊 {prefix}Progress: {self.completed}/{self.total or '?'} URLs ({success_rate:.1f}% success rate)")
+
+    def report(self):
+        total = self.total if self.total is not None else self.completed
+        success_rate = (self.successful / total) * 100 if total else 0.0
+        print("✅ Form and iframe detection completed!")
+        print(f"   📊 Final Results: {self.completed}/{total} URLs processed")
+        print(f"   📊 Success Rate: {success_rate:.1f}% ({self.successful} successful)")
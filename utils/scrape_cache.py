@@ -0,0 +1,118 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit, urlunsplit
+from utils.scrape_result import ScrapeResult
+
+CacheEntry = namedtuple('CacheEntry', ['result', 'etag', 'last_modified', 'fetched_at'])
+
+
+def normalize_url(url):
+    """Normalize a URL for use as a cache key (case-folded host, no fragment)"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == 'http' and netloc.endswith(':80')) or (scheme == 'https' and netloc.endswith(':443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    return urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))
+
+
+class ScrapeCache:
+    """On-disk cache of scrape results with HTTP revalidation validators
+
+    Entries younger than `ttl` seconds are served without a request. Older
+    entries are revalidated with a conditional GET using the stored
+    ETag/Last-Modified. The least recently used entries are evicted once the
+    cache grows past `max_entries`.
+    """
+
+    def __init__(self, path='.scrape_cache.sqlite', ttl=24 * 3600, max_entries=50000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS scrape_cache ('
+            ' url TEXT PRIMARY KEY, result TEXT NOT NULL, etag TEXT, last_modified TEXT,'
+            ' fetched_at REAL NOT NULL, last_used REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS scrape_cache_lru ON scrape_cache (last_used)')
+        self._conn.commit()
+
+    def get(self, url):
+        """Return the CacheEntry for a URL, or None if it is not cached"""
+        key = normalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT result, etag, last_modified, fetched_at FROM scrape_cache WHERE url = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE scrape_cache SET last_used = ? WHERE url = ?', (time.time(), key))
+            self._conn.commit()
+        return CacheEntry(ScrapeResult.from_dict(json.loads(row[0])), row[1], row[2], row[3])
+
+    def is_fresh(self, entry):
+        return time.time() - entry.fetched_at < self.ttl
+
+    def validators(self, entry):
+        """Conditional request headers for a cached entry"""
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def put(self, url, result, etag=None, last_modified=None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO scrape_cache VALUES (?, ?, ?, ?, ?, ?)',
+                (normalize_url(url), json.dumps(result.to_dict()), etag, last_modified, now, now)
+            )
+            self._conn.commit()
+            self._writes += 1
+            if self._writes % 500 == 0:
+                self._evict()
+
+    def touch(self, url):
+        """Mark an entry as freshly validated (after a 304 response)"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'UPDATE scrape_cache SET fetched_at = ?, last_used = ? WHERE url = ?',
+                (now, now, normalize_url(url))
+            )
+            self._conn.commit()
+
+    def record(self, outcome):
+        """Count a lookup outcome: 'hits', 'revalidated' or 'misses'"""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def _evict(self):
+        self._conn.execute(
+            'DELETE FROM scrape_cache WHERE url NOT IN '
+            '(SELECT url FROM scrape_cache ORDER BY last_used DESC LIMIT ?)', (self.max_entries,)
+        )
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._evict()
+            self._conn.close()
+
+    def summary(self):
+        total = self.hits + self.revalidated + self.misses
+        reused = self.hits + self.revalidated
+        rate = (reused / total) * 100 if total else 0.0
+        return (f"Cache: {self.hits} fresh hits, {self.revalidated} revalidated (304), "
+                f"{self.misses} misses ({rate:.1f}% reused)")
@@ -0,0 +1,64 @@
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from operator import attrgetter
+import pandas as pd
+
+
+@dataclass(frozen=True, slots=True)
+class ScrapeResult:
+    """Form and iframe detection outcome for one page"""
+    has_forms: bool = False
+    form_count: int = 0
+    form_types: str = ''
+    form_details: str = ''
+    has_iframes: bool = False
+    iframe_count: int = 0
+    iframe_sources: str = ''
+    iframe_details: str = ''
+    iframe_forms_count: int = 0
+    iframe_with_forms_count: int = 0
+    iframe_forms_details: str = ''
+    status: str = 'Not processed'
+
+    def to_dict(self):
+        """Plain dict form used by the cache, checkpoint journal and run manifest"""
+        return dict(zip(RESULT_FIELDS, _get_fields(self)))
+
+    @classmethod
+    def from_dict(cls, data):
+        # Only successful pages carry content; every other status maps to its shared instance
+        if data.get('status') != 'Success':
+            return error_result(data.get('status', 'Not processed'))
+        return cls(**data)
+
+
+RESULT_FIELDS = tuple(f.name for f in fields(ScrapeResult))
+# DataFrame column names ('status' is exported as 'scrape_status')
+RESULT_COLUMNS = [name if name != 'status' else 'scrape_status' for name in RESULT_FIELDS]
+_get_fields = attrgetter(*RESULT_FIELDS)
+
+
+@lru_cache(maxsize=1024)
+def error_result(status):
+    """Shared result for a page without content (errors, empty pages); one instance per status"""
+    return ScrapeResult(status=status)
+
+
+NOT_PROCESSED = error_result('Not processed')
+NO_CONTENT = error_result('No forms or iframes found')
+# Outcomes that describe the page itself; any other status (timeouts, connection errors, HTTP errors)
+# may be transient, so such results are not carried over to the next run
+FINAL_STATUSES = frozenset({'Success', NO_CONTENT.status})
+
+
+def results_frame(urls, results):
+    """Build the scrape result columns for a column of URLs in one pass
+
+    Each URL is looked up in the {url: ScrapeResult} mapping (NOT_PROCESSED when
+    missing) and the fields are transposed into columns, aligned with `urls`.
+    """
+    index = urls.index if isinstance(urls, pd.Series) else None
+    rows = [_get_fields(results.get(url, NOT_PROCESSED)) for url in urls]
+    columns = zip(*rows) if rows else [()] * len(RESULT_COLUMNS)
+    return pd.DataFrame(dict(zip(RESULT_COLUMNS, (list(c) for c in columns))), index=index,
+                        columns=RESULT_COLUMNS)
@@ -0,0 +1,72 @@
+import re
+import pandas as pd
+
+# Hyphen/underscore separated words that make a segment a free-text slug rather than a section name
+LONG_SLUG_MIN_WORDS = 6
+
+# One precompiled tokenizer; the first alternative that matches the whole segment names its kind.
+# A trailing file extension is allowed and kept (e.g. "123.html" -> "{num}.html").
+SEGMENT_RE = re.compile(r'''
+    (?:
+        (?P<uuid>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})
+      | (?P<date>(?:19|20)\d{2}(?P<sep>[-_.]?)(?:0[1-9]|1[0-2])(?:(?P=sep)(?:0[1-9]|[12]\d|3[01]))?)
+      | (?P<hash>(?=[0-9a-f]*[a-f])(?=[0-9a-f]*\d)[0-9a-f]{12,})
+      | (?P<num>\d+)
+      | (?P<slug>[a-z0-9]+(?:[-_][a-z0-9]+){%d,})
+    )
+    (?P<ext>\.[a-z0-9]{1,5})?
+''' % (LONG_SLUG_MIN_WORDS - 1), re.IGNORECASE | re.VERBOSE)
+
+PLACEHOLDERS = {
+    'uuid': '{id}',
+    'date': '{date}',
+    'hash': '{hash}',
+    'num': '{num}',
+    'slug': '{slug}',
+}
+
+
+def classify_segment(segment):
+    """Kind of a path segment: 'uuid', 'date', 'hash', 'num', 'slug', or None for a literal"""
+    match = SEGMENT_RE.fullmatch(segment)
+    return match and _kind(match)
+
+
+def _kind(match):
+    return next(kind for kind in PLACEHOLDERS if match.group(kind) is not None)
+
+
+class SegmentNormalizer:
+    """Replace variable path segments (ids, dates, hashes, long slugs) with placeholders
+
+    Results are memoized per segment and per path, so the segments shared by
+    most URLs of a site are classified once.
+    """
+
+    def __init__(self):
+        self._segments = {}
+        self._paths = {}
+
+    def segment(self, segment):
+        normalized = self._segments.get(segment)
+        if normalized is None:
+            match = SEGMENT_RE.fullmatch(segment)
+            if match is None:
+                normalized = segment
+            else:
+                normalized = PLACEHOLDERS[_kind(match)] + (match.group('ext') or '')
+            self._segments[segment] = normalized
+        return normalized
+
+    def path(self, path):
+        """Normalize every segment of a '/'-separated path"""
+        normalized = self._paths.get(path)
+        if normalized is None:
+            normalized = self._paths[path] = '/'.join(map(self.segment, path.split('/')))
+        return normalized
+
+    def normalize(self, paths):
+        """Normalized paths for a whole column; each distinct path is normalized once"""
+        codes, uniques = pd.factorize(paths)
+        normalized = pd.Series([self.path(path) for path in uniques.tolist()], dtype=object)
+        return pd.Series(normalized.to_numpy()[codes], index=paths.index)
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+# MinHash sketch length; the LSH bands x rows split is derived from it and the threshold
+MINHASH_PERMUTATIONS = 128
+# Chance that two sets exactly at the threshold share at least one LSH band
+LSH_RECALL = 0.95
+# Hashes (set elements x permutations) computed per numpy batch: about 8 MB per int64 array of the
+# batch, so memory stays bounded however many sets there are and however large they get
+SKETCH_CHUNK_HASHES = 1 << 20
+# Mersenne prime for the (a * x + b) mod p permutations; block ids stay far below it
+_PRIME = (1 << 31) - 1
+
+
+def lsh_bands(threshold, permutations=MINHASH_PERMUTATIONS, recall=LSH_RECALL):
+    """(bands, rows) with bands * rows == permutations for LSH bucketing at a Jaccard threshold
+
+    Sets with similarity s share a band with probability 1 - (1 - s**rows)**bands.
+    The split with the most rows (fewest dissimilar candidates) that still
+    reaches `recall` at the threshold is used.
+    """
+    splits = [(permutations // rows, rows) for rows in range(permutations, 0, -1) if permutations % rows == 0]
+    for bands, rows in splits:
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            return bands, rows
+    return splits[-1]
+
+
+def _chunk_bounds(sizes, max_elements):
+    """(start, end) ranges of consecutive sets holding at most max_elements elements in total
+
+    A set larger than max_elements on its own still gets a chunk of its own.
+    """
+    ends = np.cumsum(sizes)
+    start, done = 0, 0
+    while start < len(sizes):
+        end = max(int(np.searchsorted(ends, done + max_elements, side='right')), start + 1)
+        yield start, end
+        start, done = end, int(ends[end - 1])
+
+
+def minhash_sketches(block_sets, permutations=MINHASH_PERMUTATIONS, seed=1, chunk_hashes=SKETCH_CHUNK_HASHES):
+    """MinHash sketch (one row of `permutations` values) of each non-empty set of integer ids"""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _PRIME, size=permutations, dtype=np.int64)
+    b = rng.integers(0, _PRIME, size=permutations, dtype=np.int64)
+    sketches = np.empty((len(block_sets), permutations), dtype=np.int64)
+    sizes = np.fromiter((len(ids) for ids in block_sets), dtype=np.int64, count=len(block_sets))
+    for chunk_start, chunk_end in _chunk_bounds(sizes, max(1, chunk_hashes // permutations)):
+        chunk_sizes = sizes[chunk_start:chunk_end]
+        ids = np.fromiter((i for ids in block_sets[chunk_start:chunk_end] for i in ids), dtype=np.int64,
+                          count=int(chunk_sizes.sum()))
+        # Every element hashed under every permutation at once (one row per permutation keeps
+        # each set's elements contiguous), then the minimum per set
+        hashes = (a[:, None] * ids + b[:, None]) % _PRIME
+        starts = np.concatenate(([0], np.cumsum(chunk_sizes)[:-1]))
+        sketches[chunk_start:chunk_end] = np.minimum.reduceat(hashes, starts, axis=1).T
+    return sketches
+
+
+def _bit_count(bits):
+    return bin(bits).count('1')
+
+
+def cluster_signatures(bitsets, threshold=0.8, permutations=MINHASH_PERMUTATIONS, seed=1):
+    """Merge near-duplicate block sets; returns the cluster id (a member's index) of every bitset
+
+    Sets whose sketches agree on a whole LSH band become candidates, and a
+    candidate joins its bucket's first member when their exact Jaccard
+    similarity is at least `threshold` (so clusters can chain through similar
+    members). Each set is sketched and bucketed once, so the cost grows
+    linearly with the number of distinct sets rather than with all pairs.
+    The empty set (index 0 when present) is never merged.
+    """
+    parent = list(range(len(bitsets)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    members = [i for i, bits in enumerate(bitsets) if bits]
+    if len(members) > 1:
+        block_sets = []
+        for i in members:
+            bits, ids = bitsets[i], []
+            while bits:
+                low = bits & -bits
+                ids.append(low.bit_length() - 1)
+                bits ^= low
+            block_sets.append(ids)
+        sketches = minhash_sketches(block_sets, permutations, seed)
+        sizes = [len(ids) for ids in block_sets]
+        bands, rows = lsh_bands(threshold, permutations)
+        mixer = np.random.default_rng(seed + 1).integers(1, 1 << 62, size=rows, dtype=np.int64).astype(np.uint64)
+        for band in range(bands):
+            keys = (sketches[:, band * rows:(band + 1) * rows].astype(np.uint64) * mixer).sum(axis=1)
+            codes, _ = pd.factorize(keys)
+            # Only buckets holding two or more sets can merge anything
+            candidates = np.flatnonzero(np.bincount(codes)[codes] > 1)
+            if not len(candidates):
+                continue
+            order = candidates[np.argsort(codes[candidates], kind='stable')]
+            bucket_starts = np.flatnonzero(np.diff(codes[order], prepend=-1))
+            for start, end in zip(bucket_starts.tolist(), np.append(bucket_starts[1:], len(order)).tolist()):
+                first = order[start]
+                for j in order[start + 1:end].tolist():
+                    shared = _bit_count(bitsets[members[first]] & bitsets[members[j]])
+                    if shared / (sizes[first] + sizes[j] - shared) >= threshold:
+                        root_first, root_j = find(members[first]), find(members[j])
+                        if root_first != root_j:
+                            parent[max(root_first, root_j)] = min(root_first, root_j)
+    return np.array([find(i) for i in range(len(bitsets))], dtype=np.int64)
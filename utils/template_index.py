@@ -0,0 +1,93 @@
+import numpy as np
+
+
+class TemplateIndex:
+    """Inverted index from page URL to the block names found on that page
+
+    Block names are interned to integer ids (in first-seen order) and each
+    URL's blocks are kept as a bitset of those ids, so a page's block set is
+    canonical whatever order its blocks were listed in. Distinct bitsets are
+    interned again as integer template signatures (0 = no blocks); the
+    comma-separated names are only built per distinct signature, for output.
+    """
+
+    def __init__(self):
+        self.names = []  # block id -> name
+        self._block_ids = {}  # name -> block id
+        self._bits_by_url = {}  # url -> bitset of block ids
+        self._signature_ids = {0: 0}  # bitset -> signature id
+        self._signature_bits = [0]  # signature id -> bitset
+
+    @classmethod
+    def from_blocks(cls, blocks):
+        """Build the index in a single pass over the inventory blocks"""
+        index = cls()
+        for block in blocks:
+            name = block.get("name")
+            for instance in block.get("instances") or []:
+                if "url" in instance:
+                    index.add(instance["url"], name)
+        return index
+
+    def add(self, url, name):
+        """Record that block `name` has an instance on `url`"""
+        # Skip "unknown" names; duplicates set the same bit again
+        if not name or name == "unknown":
+            return
+        block_id = self._block_ids.get(name)
+        if block_id is None:
+            block_id = self._block_ids[name] = len(self.names)
+            self.names.append(name)
+        self._bits_by_url[url] = self._bits_by_url.get(url, 0) | (1 << block_id)
+
+    def block_ids(self, url):
+        """Sorted block ids for a URL"""
+        return _bit_positions(self._bits_by_url.get(url, 0))
+
+    def block_names(self, url):
+        """Return the de-duplicated block names for a URL, in block id order"""
+        return [self.names[block_id] for block_id in self.block_ids(url)]
+
+    def template_details(self, url):
+        """Return the comma-separated block names used as template details"""
+        return ', '.join(self.block_names(url))
+
+    def signature(self, url):
+        """Integer id of the URL's block set (0 when it has no blocks)"""
+        bits = self._bits_by_url.get(url, 0)
+        signature = self._signature_ids.get(bits)
+        if signature is None:
+            signature = self._signature_ids[bits] = len(self._signature_bits)
+            self._signature_bits.append(bits)
+        return signature
+
+    def signatures(self, urls):
+        """Signature ids for a sequence of URLs as an integer array"""
+        return np.fromiter((self.signature(url) for url in urls), dtype=np.int64, count=len(urls))
+
+    def signature_bitsets(self):
+        """Block id bitset of every signature id so far, indexed by id"""
+        return list(self._signature_bits)
+
+    def signature_details(self):
+        """Template details string of every signature id so far, as an array indexed by id"""
+        return np.array([', '.join(self.names[block_id] for block_id in _bit_positions(bits))
+                         for bits in self._signature_bits], dtype=object)
+
+    def urls(self):
+        return self._bits_by_url.keys()
+
+    def __contains__(self, url):
+        return url in self._bits_by_url
+
+    def __len__(self):
+        return len(self._bits_by_url)
+
+
+def _bit_positions(bits):
+    positions = []
+    while bits:
+        low = bits & -bits
+        positions.append(low.bit_length() - 1)
+        bits ^= low
+    return positions
@@ -0,0 +1,62 @@
+import pandas as pd
+
+# urlparse() scheme prefix; the netloc follows as "//host" and the path runs up to ? or #
+SCHEME_RE = r'^[A-Za-z][A-Za-z0-9+.\-]*:'
+# Schemes for which urlparse() moves ";params" on the last path segment out of the path
+PARAMS_SCHEMES = ['', 'ftp', 'hdl', 'prospero', 'http', 'imap', 'https', 'shttp', 'rtsp', 'rtspu',
+                  'sip', 'sips', 'mms', 'sftp', 'tel']
+
+HOME_PATHS = ['/', '', '/index.html']
+
+FEATURE_COLUMNS = ['host', 'path', 'pattern', 'group_key', 'locale', 'is_home']
+
+
+def extract_url_features(urls):
+    """Compute grouping features for a whole column of URLs with Series.str operations
+
+    Returns a DataFrame aligned with `urls` holding:
+    - host: lower-cased network location
+    - path: the URL path as urlparse() reports it
+    - pattern: path segments except the last (url_processor / claude_agent grouping key)
+    - group_key: first two path segments (group_urls grouping key)
+    - locale: 2-letter locale code, 'en' by default, '' for bare domains
+    - is_home: True for "/", "" and "/index.html"
+
+    Every step works on the whole column; with pyarrow installed pandas runs
+    the string methods natively instead of once per URL in Python.
+    """
+    urls = urls if isinstance(urls, pd.Series) else pd.Series(list(urls), dtype=object)
+
+    # Same normalization as the original per-row helpers: drop protocol and "www."
+    stripped = (urls.str.replace('https://', '', regex=False).str.replace('http://', '', regex=False)
+                .str.replace('www.', '', regex=False))
+    has_path = stripped.str.contains('/', regex=False)
+    path = stripped.str.replace(r'^[^/]*/?', '', regex=True).str.strip('/')
+
+    # Pattern: all segments except the last one (file name)
+    pattern = path.str.replace(r'/[^/]*$', '', regex=True)
+    first_segment = path.str.replace(r'/[\s\S]*', '', regex=True)
+
+    # Locale: 2-letter first segment, or a path that is exactly "xx.html"
+    locale = pd.Series('en', index=urls.index, dtype=path.dtype)
+    locale = locale.mask((path.str.len() == 7) & path.str.endswith('.html') & path.str[:2].str.isalpha(),
+                         path.str[:2].str.lower())
+    locale = locale.mask((first_segment.str.len() == 2) & first_segment.str.isalpha(), first_segment.str.lower())
+    locale = locale.mask(~has_path | (path == ''), '')
+
+    # Host and path split the way urlparse() does: optional scheme, optional //netloc, path up to ? or #
+    after_scheme = urls.str.replace(SCHEME_RE, '', regex=True)
+    host = (after_scheme.str[2:].str.replace(r'[/?#][\s\S]*', '', regex=True).str.lower()
+            .where(after_scheme.str.startswith('//'), ''))
+    url_path = after_scheme.str.replace(r'^//[^/?#]*', '', regex=True).str.replace(r'[?#][\s\S]*', '', regex=True)
+    params = url_path.str.contains(';', regex=False)
+    if params.any():
+        # Drop ";params" from the last path segment like urlparse() does
+        schemes = urls.str.extract(f'({SCHEME_RE})', expand=False).fillna(':').str[:-1].str.lower()
+        params &= schemes.isin(PARAMS_SCHEMES)
+        url_path = url_path.mask(params, url_path.str.replace(r';[^/]*$', '', regex=True))
+    group_key = url_path.str.strip('/').str.replace(r'^([^/]*/[^/]*)/[\s\S]*', r'\1', regex=True)
+
+    return pd.DataFrame({'host': host, 'path': url_path, 'pattern': pattern, 'group_key': group_key,
+                         'locale': locale, 'is_home': url_path.isin(HOME_PATHS)},
+                        index=urls.index, columns=FEATURE_COLUMNS)
@@ -1,480 +1,636 @@
-import anthropic
 import json
+import numpy as np
 import pandas as pd
-from urllib.parse import urlparse
 import os
 import requests
-from bs4 import BeautifulSoup
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from itertools import chain, islice
 import urllib3
 import warnings
+from utils.inventory import Inventory
+from utils.scrape_cache import ScrapeCache
+from utils.http_session import HttpSession
+from utils.iframe_memo import IframeMemo
+from utils.html_parsers import set_default_parser
+from utils.rate_limit import HostRateLimiter
+from utils.scheduler import iter_bounded, FairScheduler, ScrapeProgress
+from utils.checkpoint import CheckpointJournal, checkpoint_path
+from utils.run_manifest import RunManifest, manifest_path, url_id
+from utils.url_features import extract_url_features
+from utils.page_content import REQUEST_HEADERS, parse_page_content, fetch_iframe_form_count, build_content_result
+from utils.scrape_result import ScrapeResult, FINAL_STATUSES, error_result, results_frame
+from utils.exporters import export_dataframe
+from utils.report_stats import compute_report_stats, write_report
+from utils.metrics import RunMetrics
+from utils.parse_pool import create_parse_pool, parse_pool_size
+from utils.batch import load_site
+from utils.path_trie import PathTrie
+from utils.template_clusters import cluster_signatures
+from utils.segment_classifier import SegmentNormalizer
+from utils.frame_memory import compact_frame, memory_report
 
 # Suppress SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 warnings.filterwarnings('ignore', message='Unverified HTTPS request')
 
-def scrape_url_for_content(url, timeout=8):
-    """Scrape a URL to detect forms and iframes and gather their information"""
+# Per-host request rates (requests per second, also used as the burst size)
+DEFAULT_HOST_RPS = 5.0
+MAIN_SITE_RPS = 20.0
+
+# Columns of the exported frame, in order
+OUTPUT_COLUMNS = ['url', 'source', 'group', 'locale', 'template', 'template_details',
+                  'has_forms', 'form_count', 'form_types', 'form_details',
+                  'has_iframes', 'iframe_count', 'iframe_sources', 'iframe_details',
+                  'iframe_forms_count', 'iframe_with_forms_count', 'iframe_forms_details', 'scrape_status']
+
+# Smallest number of URLs that makes a group
+GROUP_MIN_PAGES = 5
+
+# Number of upcoming URLs inspected to pick hosts to pre-connect to
+WARM_UP_LOOKAHEAD = 5000
+
+def iframe_form_counts(page, session=None, iframe_memo=None, parse_pool=None):
+    """{iframe source: form count} for the fetchable iframes of a parsed page"""
+    counts = {}
+    for iframe in page['iframes']:
+        iframe_url = iframe['fetch_url']
+        if iframe_url and iframe_url not in counts:
+            if iframe_memo:
+                counts[iframe_url] = iframe_memo.get(
+                    iframe_url, lambda u: fetch_iframe_form_count(u, session=session, parse_pool=parse_pool))
+            else:
+                counts[iframe_url] = fetch_iframe_form_count(iframe_url, session=session, parse_pool=parse_pool)
+    return counts
+
+def analyze_page_content(url, html, session=None, iframe_memo=None, parse_pool=None):
+    """Detect forms and iframes (checking iframe sources for forms) in a page's HTML
+    
+    With a parse_pool the raw bytes are parsed in a worker process while this
+    thread waits; PagePipeline parses without holding up a thread.
+    """
+    if parse_pool:
+        page = parse_pool.submit(parse_page_content, url, html).result()
+    else:
+        page = parse_page_content(url, html)
+    return build_content_result(page, iframe_form_counts(page, session, iframe_memo, parse_pool))
+
+def fetch_page(url, timeout=8, cache=None, session=None):
+    """Network half of scrape_url_for_content
+    
+    Returns (html, etag, last_modified) for a page that still has to be
+    parsed, or the final ScrapeResult when there is nothing to parse (fresh or
+    revalidated cache entry, failed request).
+    """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
-        
-        response = requests.get(url, headers=headers, timeout=timeout, verify=False, allow_redirects=True)
+        headers = REQUEST_HEADERS
+        cached = cache.get(url) if cache else None
+        if cached:
+            if cache.is_fresh(cached):
+                cache.record('hits')
+                return cached.result
+            # Revalidate the stale entry with a conditional GET
+            headers = {**REQUEST_HEADERS, **cache.validators(cached)}
+        
+        http = session or requests
+        response = http.get(url, headers=headers, timeout=timeout, verify=False, allow_redirects=True)
+        if cached and response.status_code == 304:
+            cache.record('revalidated')
+            cache.touch(url)
+            return cached.result
+        if cache:
+            cache.record('misses')
         response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        forms = soup.find_all('form')
-        iframes = soup.find_all('iframe')
-        
-        # If neither forms nor iframes found
-        if not forms and not iframes:
-            return {
-                'has_forms': False,
-                'form_count': 0,
-                'form_types': '',
-                'form_details': '',
-                'has_iframes': False,
-                'iframe_count': 0,
-                'iframe_sources': '',
-                'iframe_details': '',
-                'iframe_forms_count': 0,
-                'iframe_with_forms_count': 0,
-                'iframe_forms_details': '',
-                'status': 'No forms or iframes found'
-            }
-        
-        # Process forms
-        form_details = []
-        form_types = set()
-        
-        for form in forms:
-            method = form.get('method', 'GET').upper()
-            action = form.get('action', '')
-            form_id = form.get('id', '')
-            form_class = form.get('class', '')
-            
-            # Count input types
-            inputs = form.find_all(['input', 'textarea', 'select'])
-            input_types = [inp.get('type', 'text') for inp in form.find_all('input')]
-            
-            # Determine form type based on inputs and attributes
-            if 'search' in str(form).lower() or any('search' in str(inp).lower() for inp in inputs):
-                form_types.add('Search')
-            elif any(inp_type in ['email', 'password'] for inp_type in input_types):
-                form_types.add('Login/Registration')
-            elif any(inp_type in ['email'] for inp_type in input_types) and len(inputs) <= 3:
-                form_types.add('Newsletter')
-            elif len(inputs) >= 4:
-                form_types.add('Contact/Lead')
-            else:
-                form_types.add('Other')
-            
-            form_detail = f"{method} form"
-            if action:
-                form_detail += f" (action: {action[:50]}{'...' if len(action) > 50 else ''})"
-            if form_id:
-                form_detail += f" (id: {form_id})"
-            
-            form_details.append(form_detail)
-        
-        # Process iframes and check for forms within them - only track iframes with forms
-        iframe_details = []
-        iframe_sources = set()
-        iframe_forms_found = 0
-        iframe_with_forms = []
-        
-        for iframe in iframes:
-            src = iframe.get('src', '')
-            iframe_id = iframe.get('id', '')
-            title = iframe.get('title', '')
-            width = iframe.get('width', '')
-            height = iframe.get('height', '')
-            
-            # Check if iframe URL contains forms
-            iframe_has_forms = False
-            if src:
-                # Normalize URL for iframe scraping
-                iframe_url = src
-                if src.startswith('//'):
-                    iframe_url = 'https:' + src
-                elif src.startswith('/'):
-                    # Relative URL - construct full URL from main page
-                    from urllib.parse import urljoin
-                    iframe_url = urljoin(url, src)
-                
-                # Only scrape iframe if it's a valid HTTP(S) URL and not a data URL
-                if iframe_url.startswith(('http://', 'https://')) and 'data:' not in iframe_url:
-                    try:
-                        # Quick check for forms in iframe (shorter timeout)
-                        iframe_response = requests.get(iframe_url, headers=headers, timeout=5, verify=False, allow_redirects=True)
-                        iframe_response.raise_for_status()
-                        iframe_soup = BeautifulSoup(iframe_response.content, 'html.parser')
-                        iframe_forms = iframe_soup.find_all('form')
-                        if iframe_forms:
-                            iframe_has_forms = True
-                            iframe_forms_found += len(iframe_forms)
-                            iframe_with_forms.append({
-                                'url': iframe_url,
-                                'form_count': len(iframe_forms),
-                                'iframe_id': iframe_id or 'no-id'
-                            })
-                    except:
-                        # Silently fail if iframe can't be scraped
-                        pass
-            
-            # Only track iframe if it contains forms
-            if iframe_has_forms:
-                # Categorize iframe sources
-                if src:
-                    if 'youtube' in src.lower() or 'vimeo' in src.lower():
-                        iframe_sources.add('Video')
-                    elif 'google' in src.lower() and 'maps' in src.lower():
-                        iframe_sources.add('Maps')
-                    elif 'facebook' in src.lower() or 'twitter' in src.lower() or 'instagram' in src.lower():
-                        iframe_sources.add('Social Media')
-                    elif 'recaptcha' in src.lower():
-                        iframe_sources.add('reCAPTCHA')
-                    elif src.startswith('//') or src.startswith('http'):
-                        iframe_sources.add('External Content')
-                    else:
-                        iframe_sources.add('Internal Content')
-                else:
-                    iframe_sources.add('No Source')
-                
-                iframe_detail = f"iframe with forms"
-                if src:
-                    iframe_detail += f" (src: {src[:50]}{'...' if len(src) > 50 else ''})"
-                if iframe_id:
-                    iframe_detail += f" (id: {iframe_id})"
-                if title:
-                    iframe_detail += f" (title: {title[:30]}{'...' if len(title) > 30 else ''})"
-                if width and height:
-                    iframe_detail += f" ({width}x{height})"
-                iframe_detail += " [FORMS DETECTED]"
-                
-                iframe_details.append(iframe_detail)
-        
-        return {
-            'has_forms': len(forms) > 0,
-            'form_count': len(forms),
-            'form_types': ', '.join(sorted(form_types)) if form_types else '',
-            'form_details': ' | '.join(form_details) if form_details else '',
-            'has_iframes': len(iframe_details) > 0,  # Only count iframes with forms
-            'iframe_count': len(iframe_details),      # Only count iframes with forms
-            'iframe_sources': ', '.join(sorted(iframe_sources)) if iframe_sources else '',
-            'iframe_details': ' | '.join(iframe_details) if iframe_details else '',
-            'iframe_forms_count': iframe_forms_found,
-            'iframe_with_forms_count': len(iframe_with_forms),
-            'iframe_forms_details': ' | '.join([f"{item['url']} ({item['form_count']} forms)" for item in iframe_with_forms]) if iframe_with_forms else '',
-            'status': 'Success'
-        }
+        return response.content, response.headers.get('ETag'), response.headers.get('Last-Modified')
         
     except requests.exceptions.Timeout:
-        return {
-            'has_forms': False,
-            'form_count': 0,
-            'form_types': '',
-            'form_details': '',
-            'has_iframes': False,
-            'iframe_count': 0,
-            'iframe_sources': '',
-            'iframe_details': '',
-            'iframe_forms_count': 0,
-            'iframe_with_forms_count': 0,
-            'iframe_forms_details': '',
-            'status': 'Timeout'
-        }
+        return error_result('Timeout')
     except requests.exceptions.ConnectionError:
-        return {
-            'has_forms': False,
-            'form_count': 0,
-            'form_types': '',
-            'form_details': '',
-            'has_iframes': False,
-            'iframe_count': 0,
-            'iframe_sources': '',
-            'iframe_details': '',
-            'iframe_forms_count': 0,
-            'iframe_with_forms_count': 0,
-            'iframe_forms_details': '',
-            'status': 'Connection Error'
-        }
+        return error_result('Connection Error')
     except requests.exceptions.HTTPError as e:
-        return {
-            'has_forms': False,
-            'form_count': 0,
-            'form_types': '',
-            'form_details': '',
-            'has_iframes': False,
-            'iframe_count': 0,
-            'iframe_sources': '',
-            'iframe_details': '',
-            'iframe_forms_count': 0,
-            'iframe_with_forms_count': 0,
-            'iframe_forms_details': '',
-            'status': f'HTTP {e.response.status_code}'
-        }
+        return error_result(f'HTTP {e.response.status_code}')
     except Exception as e:
-        return {
-            'has_forms': False,
-            'form_count': 0,
-            'form_types': '',
-            'form_details': '',
-            'has_iframes': False,
-            'iframe_count': 0,
-            'iframe_sources': '',
-            'iframe_details': '',
-            'iframe_forms_count': 0,
-            'iframe_with_forms_count': 0,
-            'iframe_forms_details': '',
-            'status': f'Error: {str(e)[:50]}'
-        }
-
-def scrape_urls_for_content(urls, max_workers=3):
-    """Scrape multiple URLs for forms and iframes using threading"""
-    print(f"🕷️  Starting form and iframe detection for {len(urls)} URLs...")
-    print(f"   Using {max_workers} concurrent workers with rate limiting...")
-    
-    results = {}
-    completed = 0
-    successful = 0
+        return error_result(f'Error: {str(e)[:50]}')
+
+def scrape_url_for_content(url, timeout=8, cache=None, session=None, iframe_memo=None, parse_pool=None):
+    """Scrape a URL to detect forms and iframes and gather their information"""
+    fetched = fetch_page(url, timeout=timeout, cache=cache, session=session)
+    if isinstance(fetched, ScrapeResult):
+        return fetched
+    html, etag, last_modified = fetched
+    try:
+        result = analyze_page_content(url, html, session=session, iframe_memo=iframe_memo, parse_pool=parse_pool)
+        if cache:
+            cache.put(url, result, etag, last_modified)
+        return result
+    except Exception as e:
+        return error_result(f'Error: {str(e)[:50]}')
+
+class PagePipeline:
+    """Scrapes pages in stages so that no fetching thread waits for a parse
     
+    The fetch stage runs on an I/O thread and hands the raw bytes to the parse
+    pool. When the parse is done, the finish stage (iframe form counts,
+    building and caching the ScrapeResult) is submitted back to the I/O
+    threads through `submit`. So the fetching threads keep the network busy
+    while every parse process works. Without a parse pool, pages are parsed
+    in the fetching thread.
+    """
+
+    def __init__(self, submit, parse_pool=None, cache=None, session=None, iframe_memo=None):
+        self.submit = submit
+        self.parse_pool = parse_pool
+        self.cache = cache
+        self.session = session
+        self.iframe_memo = iframe_memo
+
+    def scrape(self, url):
+        """Future of the page's ScrapeResult, with the fetch queued on the I/O threads"""
+        future = Future()
+        self.submit(self.fetch, url, future)
+        return future
+
+    def fetch(self, url, future=None):
+        """Fetch stage, run in the calling thread; returns the future the result will be set on"""
+        future = future or Future()
+        try:
+            fetched = fetch_page(url, cache=self.cache, session=self.session)
+            if isinstance(fetched, ScrapeResult):
+                future.set_result(fetched)
+            elif self.parse_pool is None:
+                self._finish(url, partial(parse_page_content, url, fetched[0]), fetched[1:], future)
+            else:
+                parsed = self.parse_pool.submit(parse_page_content, url, fetched[0])
+                parsed.add_done_callback(partial(self._parsed, url, fetched[1:], future))
+        except Exception:
+            future.set_result(error_result('Processing Error'))
+        return future
+
+    def _parsed(self, url, validators, future, parsed):
+        # Runs on the parse pool's result thread, so the finish stage goes back to the I/O threads
+        try:
+            self.submit(self._finish, url, parsed.result, validators, future)
+        except RuntimeError:
+            # The I/O threads were shut down because the run stopped early
+            future.set_result(error_result('Processing Error'))
+
+    def _finish(self, url, parse, validators, future):
+        try:
+            page = parse()
+            result = build_content_result(page, iframe_form_counts(page, self.session, self.iframe_memo,
+                                                                   self.parse_pool))
+            if self.cache:
+                self.cache.put(url, result, *validators)
+        except Exception as e:
+            result = error_result(f'Error: {str(e)[:50]}')
+        future.set_result(result)
+
+def iter_scrape_results(urls, max_workers=3, max_in_flight=None, cache=None, session=None, iframe_memo=None,
+                        parse_pool=None):
+    """Yield (url, result) pairs as pages finish, keeping at most max_in_flight pages in the pipeline"""
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all scraping tasks
-        future_to_url = {executor.submit(scrape_url_for_content, url): url for url in urls}
-        
-        # Process completed tasks
-        for future in as_completed(future_to_url):
-            url = future_to_url[future]
+        pipeline = PagePipeline(executor.submit, parse_pool=parse_pool, cache=cache, session=session,
+                                iframe_memo=iframe_memo)
+        for url, future in iter_bounded(pipeline.scrape, urls, max_in_flight or max_workers * 4):
             try:
                 result = future.result()
+            except Exception:
+                result = error_result('Processing Error')
+            yield url, result
+
+def scrape_urls_for_content(urls, max_workers=3, cache=None, engine='threads',
+                            max_concurrency=200, per_host_limit=16, rate_limiter=None,
+                            sink=None, max_in_flight=None, metrics=None, parse_workers=None):
+    """Scrape multiple URLs for forms and iframes using threading (or the asyncio engine)
+    
+    `urls` may be any iterable. Results are returned as a dict, or passed to
+    sink(url, result) as they complete when a sink is given (nothing is kept).
+    HTML is parsed in a pool of `parse_workers` processes (default: one per
+    core, inline on a single core) while the threads only do network I/O;
+    enough pages are kept in flight to keep both the threads and every parse
+    process busy.
+    """
+    total = len(urls) if hasattr(urls, '__len__') else None
+    if engine == 'asyncio':
+        from utils.async_scraper import scrape_urls_for_content_async
+        return scrape_urls_for_content_async(urls, max_concurrency=max_concurrency,
+                                             per_host_limit=per_host_limit, cache=cache,
+                                             rate_limiter=rate_limiter, sink=sink, metrics=metrics,
+                                             parse_workers=parse_workers)
+    
+    print(f"🕷️  Starting form and iframe detection for {total if total is not None else 'streamed'} URLs...")
+    print(f"   Using {max_workers} concurrent workers with per-host rate limiting...")
+    
+    results = {}
+    progress = ScrapeProgress(total)
+    
+    # One pooled keep-alive session shared by all workers, pre-connected to the busiest hosts
+    # (looked up from the first WARM_UP_LOOKAHEAD URLs so streamed input is not consumed)
+    session = HttpSession(pool_maxsize=max_workers, rate_limiter=rate_limiter, metrics=metrics)
+    url_iter = iter(urls)
+    head = list(islice(url_iter, WARM_UP_LOOKAHEAD))
+    session.warm_up(head)
+    # Each distinct iframe source is fetched once per run
+    iframe_memo = IframeMemo()
+    # Parsing runs in worker processes so the fetching threads are never stalled on the GIL
+    parse_processes = parse_pool_size(parse_workers)
+    parse_pool = create_parse_pool(parse_processes)
+    if parse_pool:
+        print(f"   Parsing HTML in {parse_processes} worker processes...")
+    
+    try:
+        for url, result in iter_scrape_results(chain(head, url_iter), max_workers=max_workers,
+                                               max_in_flight=max_in_flight or (max_workers + parse_processes) * 4,
+                                               cache=cache,
+                                               session=session, iframe_memo=iframe_memo,
+                                               parse_pool=parse_pool):
+            progress.add(result)
+            if sink:
+                sink(url, result)
+            else:
                 results[url] = result
-                completed += 1
-                
-                if result['status'] == 'Success':
-                    successful += 1
-                
-                # Progress update every 25 URLs
-                if completed % 25 == 0:
-                    success_rate = (successful / completed) * 100
-                    print(f"  📊 Progress: {completed}/{len(urls)} URLs ({success_rate:.1f}% success rate)")
-                    
-                # Rate limiting - small delay between requests
-                time.sleep(0.05)
-                
-            except Exception as e:
-                results[url] = {
-                    'has_forms': False,
-                    'form_count': 0,
-                    'form_types': '',
-                    'form_details': '',
-                    'has_iframes': False,
-                    'iframe_count': 0,
-                    'iframe_sources': '',
-                    'iframe_details': '',
-                    'iframe_forms_count': 0,
-                    'iframe_with_forms_count': 0,
-                    'iframe_forms_details': '',
-                    'status': 'Processing Error'
-                }
-                completed += 1
+    finally:
+        if parse_pool:
+            parse_pool.shutdown()
     
-    success_rate = (successful / len(urls)) * 100
-    print(f"✅ Form and iframe detection completed!")
-    print(f"   📊 Final Results: {completed}/{len(urls)} URLs processed")
-    print(f"   📊 Success Rate: {success_rate:.1f}% ({successful} successful)")
+    progress.report()
+    if cache:
+        print(f"   📊 {cache.summary()}")
+    print(f"   📊 {session.summary()}")
+    if rate_limiter:
+        print(f"   📊 {rate_limiter.summary()}")
+    print(f"   📊 {iframe_memo.summary()}")
+    session.close()
     return results
 
-def process_urls(urls, domain):
-    # Load inventory.json
-    with open("inventory.json") as f:
-        inventory = json.load(f)
-        blocks = inventory.get("blocks", [])
+class SharedScraper:
+    """Scraping resources shared by concurrent process_urls runs (batch mode)
+    
+    Every customer's URLs go through one fair scheduler (round-robin across
+    runs, so a large site cannot starve a small one), one pooled HTTP session
+    and rate limiter, one iframe memo, parse pool and cache. Fetches are still
+    recorded in each run's own metrics.
+    """
+
+    def __init__(self, max_workers=8, use_cache=True, host_rps=DEFAULT_HOST_RPS, host_rates=None,
+                 parse_workers=None):
+        parse_processes = parse_pool_size(parse_workers)
+        # Pages waiting on a parse stay in flight, so the bound grows with the parse pool
+        self.scheduler = FairScheduler(max_workers=max_workers, max_in_flight=(max_workers + parse_processes) * 2)
+        self.rate_limiter = HostRateLimiter(rate=host_rps, burst=host_rps, host_rates=host_rates)
+        self.session = HttpSession(pool_maxsize=max_workers, rate_limiter=self.rate_limiter)
+        self.iframe_memo = IframeMemo()
+        self.cache = ScrapeCache() if use_cache else None
+        self.parse_pool = create_parse_pool(parse_processes)
+
+    def scrape(self, urls, sink, name=None, metrics=None):
+        """Scrape `urls` on the shared pool, passing each result to sink(url, result); blocks until done"""
+        print(f"🕷️  [{name}] Queued {len(urls)} URLs for form and iframe detection on the shared scraper...")
+        session = self.session.metered(metrics) if metrics else self.session
+        self.session.warm_up(urls[:WARM_UP_LOOKAHEAD])
+        progress = ScrapeProgress(len(urls), label=name)
+
+        # Fetches run on the scheduler's threads and return a future; parsing continues in the pool
+        pipeline = PagePipeline(self.scheduler.submit, parse_pool=self.parse_pool, cache=self.cache,
+                                session=session, iframe_memo=self.iframe_memo)
+
+        def record(url, result):
+            progress.add(result)
+            sink(url, result)
 
-    # Create initial dataframe
-    urls_df = pd.DataFrame(urls)
+        self.scheduler.run(urls, pipeline.fetch, record)
+        progress.report()
 
-    # Scrape URLs for form and iframe detection
-    content_results = scrape_urls_for_content(urls_df['url'].tolist())
+    def close(self):
+        self.scheduler.close()
+        if self.parse_pool:
+            self.parse_pool.shutdown()
+        if self.cache:
+            print(f"   📊 {self.cache.summary()}")
+            self.cache.close()
+        print(f"   📊 {self.session.summary()}")
+        print(f"   📊 {self.rate_limiter.summary()}")
+        print(f"   📊 {self.iframe_memo.summary()}")
+        self.session.close()
+
+def is_locale_file_pattern(segments):
+    """Locale + filename patterns (e.g. 'es/about') are never grouped"""
+    return len(segments) == 2 and segments[0].isalpha() and len(segments[0]) == 2
+
+def assign_groups(patterns, hierarchical=False, max_depth=None, min_pages=GROUP_MIN_PAGES):
+    """Name every pattern with 5 or more URLs 'Group N', except locale + filename patterns
+    
+    With `hierarchical`, URLs of smaller patterns roll up into the deepest parent
+    path that reaches min_pages; `max_depth` groups on at most that many leading
+    segments. Groups are numbered by size. Returns the per-URL group names and
+    the {group name: number} mapping used for sorting.
+    """
+    # Each distinct pattern is inserted once with its URL count, then mapped back to the URLs
+    codes, uniques = pd.factorize(patterns)
+    trie = PathTrie()
+    counts = np.bincount(codes, minlength=len(uniques))
+    nodes = [trie.insert(pattern, count) for pattern, count in zip(uniques.tolist(), counts.tolist())]
+    group_nodes = np.array(trie.group_nodes(min_pages, max_depth=max_depth, hierarchical=hierarchical,
+                                            exclude=is_locale_file_pattern), dtype=int)
+    url_groups = pd.Series(group_nodes[np.array(nodes, dtype=int)][codes], index=patterns.index)
+    
+    # One extra trailing '' so ungrouped URLs (node -1) look up an empty name
+    group_names = np.full(len(trie) + 1, '', dtype=object)
+    group_index_mapping = {}  # For numeric sorting
+    for current_group, node in enumerate(url_groups[url_groups >= 0].value_counts().index, start=1):
+        print(f"\nCreating Group {current_group} for pattern: {trie.path(node)}")
+        group_name = f'Group {current_group}'
+        group_names[node] = group_name
+        group_index_mapping[group_name] = current_group
     
+    return pd.Series(group_names[url_groups], index=patterns.index), group_index_mapping
+
+def assign_templates(signatures):
+    """Number each distinct non-empty template signature in first-seen order (0 for pages without blocks)"""
+    codes, uniques = pd.factorize(signatures)
+    has_blocks = uniques != 0
+    numbers = np.where(has_blocks, np.cumsum(has_blocks), 0)
+    return pd.Series(numbers[codes], index=signatures.index)
+
+def cluster_templates(signatures, template_index, similarity):
+    """Map each URL's signature to its near-duplicate cluster (Jaccard similarity of the block sets >= similarity)"""
+    clusters = cluster_signatures(template_index.signature_bitsets(), threshold=similarity)
+    print(f"🧩 Template clustering: {len(np.unique(signatures))} block combinations -> "
+          f"{len(np.unique(clusters[signatures]))} templates (Jaccard >= {similarity})")
+    return pd.Series(clusters[signatures], index=signatures.index)
+
+def template_labels(templates, template_index):
+    """Arrays turning template numbers and signature ids back into 'Template N' and block name strings"""
+    count = int(templates.max()) if len(templates) else 0
+    return {
+        'template': np.array([''] + [f'Template {n}' for n in range(1, count + 1)], dtype=object),
+        'template_details': template_index.signature_details(),
+    }
+
+def add_url_features(urls_df, content_results, previous_features=None):
+    """urls_df joined with the scrape result columns, plus the pattern and locale of every URL
+
+    URLs in `previous_features` ({url: (pattern, locale)}, from the previous
+    run in incremental mode) reuse the stored values instead of being parsed.
+    """
+    previous_features = previous_features or {}
     # Add form and iframe detection results to dataframe
-    urls_df['has_forms'] = urls_df['url'].map(lambda x: content_results.get(x, {}).get('has_forms', False))
-    urls_df['form_count'] = urls_df['url'].map(lambda x: content_results.get(x, {}).get('form_count', 0))
-    urls_df['form_types'] = urls_df['url'].map(lambda x: content_results.get(x, {}).get('form_types', ''))
-    urls_df['form_details'] = urls_df['url'].map(lambda x: content_results.get(x, {}).get('form_details', ''))
-    urls_df['has_iframes'] = urls_df['url'].map(lambda x: content_results.get(x, {}).get('has_iframes', False))
-    urls_df['iframe_count'] = urls_df['url'].map(lambda x: content_results.get(x, {}).get('iframe_count', 0))
-    urls_df['iframe_sources'] = urls_df['url'].map(lambda x: content_results.get(x, {}).get('iframe_sources', ''))
-    urls_df['iframe_details'] = urls_df['url'].map(lambda x: content_results.get(x, {}).get('iframe_details', ''))
-    urls_df['iframe_forms_count'] = urls_df['url'].map(lambda x: content_results.get(x, {}).get('iframe_forms_count', 0))
-    urls_df['iframe_with_forms_count'] = urls_df['url'].map(lambda x: content_results.get(x, {}).get('iframe_with_forms_count', 0))
-    urls_df['iframe_forms_details'] = urls_df['url'].map(lambda x: content_results.get(x, {}).get('iframe_forms_details', ''))
-    urls_df['scrape_status'] = urls_df['url'].map(lambda x: content_results.get(x, {}).get('status', 'Not processed'))
-
-    # Function to get path segments for grouping
-    def get_path_segments(url):
-        # Remove protocol and www if present
-        url = url.replace('https://', '').replace('http://', '').replace('www.', '')
-        
-        # Split into domain and path
-        parts = url.split('/', 1)
-        if len(parts) < 2:
-            return ''
-        
-        path = parts[1].strip('/')
-        segments = path.split('/')
-        
-        if len(segments) > 1:
-            # Return all segments except the last one (file name)
-            return '/'.join(segments[:-1])
-        return path if path else ''
+    urls_df = urls_df.join(results_frame(urls_df['url'], content_results))
 
-    # Create patterns and count them
-    urls_df['pattern'] = urls_df['url'].apply(get_path_segments)
+    # Extract pattern and locale for all new URLs in one pass
+    new_rows = ~urls_df['url'].isin(previous_features.keys())
+    features = extract_url_features(urls_df.loc[new_rows, 'url']).reindex(urls_df.index)
+    for position, column in enumerate(['pattern', 'locale']):
+        stored = urls_df['url'].map({url: values[position] for url, values in previous_features.items()})
+        urls_df[column] = features[column].fillna(stored)
+    return urls_df
 
-    # Create groups for patterns with 5 or more occurrences, except for locale + filename URLs
-    group_mapping = {}
-    group_index_mapping = {}  # For numeric sorting
-    current_group = 1
-    for pattern, count in urls_df['pattern'].value_counts().items():
-        if count >= 5 and not (len(pattern.split('/')) == 2 and pattern.split('/')[0].isalpha() and len(pattern.split('/')[0]) == 2):
-            print(f"\nCreating Group {current_group} for pattern: {pattern}")
-            group_name = f'Group {current_group}'
-            group_mapping[pattern] = group_name
-            group_index_mapping[group_name] = current_group
-            current_group += 1
-        else:
-            group_mapping[pattern] = ''
-
-    # Assign groups to URLs
-    urls_df['group'] = urls_df['pattern'].map(lambda x: group_mapping.get(x, ''))
-
-    # Function to extract locale from URL
-    def extract_locale(url):
-        # Remove protocol and www if present
-        url = url.replace('https://', '').replace('http://', '').replace('www.', '')
-        
-        # Split into domain and path
-        parts = url.split('/', 1)
-        if len(parts) < 2:
-            return ''
-        
-        path = parts[1].strip('/')
-        if not path:
-            return ''
-        
-        # Check for 2-letter code at start of path
-        # It should be either followed by a slash or a dot
-        segments = path.split('/')
-        first_segment = segments[0]
-        
-        # Check if path is exactly 2 letters (URL ends with locale)
-        if len(path) == 2 and path.isalpha():
-            return path.lower()
-        
-        # Check if first segment is exactly 2 letters and is followed by / or .
-        if len(first_segment) == 2 and first_segment.isalpha():
-            return first_segment.lower()
-        
-        # Also check if it's "xx.html" or similar
-        if '.' in first_segment:
-            possible_locale = first_segment.split('.')[0]
-            if len(possible_locale) == 2 and possible_locale.isalpha():
-                # Only count as locale if nothing follows except .html
-                if first_segment == f"{possible_locale}.html" and len(segments) == 1:
-                    return possible_locale.lower()
-        
-        # Default to "en" if no other locale found
-        return 'en'
-
-    # Add locale column
-    urls_df['locale'] = urls_df['url'].apply(extract_locale)
-
-    # Function to find template details for a URL
-    def get_template_details(url):
-        template_details = []
-        for block in blocks:
-            if "instances" in block and block["instances"]:
-                for instance in block["instances"]:
-                    if "url" in instance and instance["url"] == url:
-                        # Use only the name field
-                        if "name" in block:
-                            name = block["name"]
-                            # Skip "unknown" names and avoid duplicates
-                            if name != "unknown" and name not in template_details:
-                                template_details.append(name)
-                        break
-        return ', '.join(template_details)
-
-    # Add template details column
-    urls_df['template_details'] = urls_df['url'].apply(get_template_details)
-
-    # Group URLs by template details and assign template names
-    template_mapping = {}
-    template_index_mapping = {}
-    current_template = 1
-    for details in urls_df['template_details'].unique():
-        if details:
-            template_name = f'Template {current_template}'
-            template_mapping[details] = template_name
-            template_index_mapping[template_name] = current_template
-            current_template += 1
-        else:
-            template_mapping[details] = ''
-
-    # Assign template names to URLs
-    urls_df['template'] = urls_df['template_details'].map(lambda x: template_mapping.get(x, ''))
-
-    # Create final dataframe with required columns including form and iframe data
-    df = urls_df[['url', 'source', 'group', 'locale', 'template', 'template_details', 
-                  'has_forms', 'form_count', 'form_types', 'form_details', 
-                  'has_iframes', 'iframe_count', 'iframe_sources', 'iframe_details',
-                  'iframe_forms_count', 'iframe_with_forms_count', 'iframe_forms_details', 'scrape_status']]
+def group_patterns(patterns, grouping='pattern', group_depth=None, normalize_segments=False):
+    """Group names for a column of URL patterns and their numbering, as returned by assign_groups
+
+    Groups are patterns with 5 or more occurrences, except for locale + filename
+    URLs ('hierarchical' rolls smaller patterns up into their parent paths).
+    Normalizing first replaces ids, dates, hashes and long slugs with
+    placeholders so such paths share a pattern.
+    """
+    if normalize_segments:
+        patterns = SegmentNormalizer().normalize(patterns)
+    return assign_groups(patterns, hierarchical=grouping == 'hierarchical', max_depth=group_depth)
+
+def template_columns(urls, template_index, template_similarity=None):
+    """(template_details, template, labels) for a column of URLs
 
-    # Add numeric group index for sorting (999999 for empty groups to put them at end)
-    df['group_index'] = df['group'].map(lambda x: group_index_mapping.get(x, 999999))
+    template_details is the integer signature of each URL's block set and
+    template its template number, so both are assigned and aggregated as
+    integers; `labels` turns them into strings for output (see template_labels).
+    With a similarity threshold, near-identical block combinations (MinHash/LSH
+    clusters) share one template.
+    """
+    signatures = pd.Series(template_index.signatures(urls), index=urls.index)
+    if template_similarity:
+        templates = assign_templates(cluster_templates(signatures, template_index, template_similarity))
+    else:
+        templates = assign_templates(signatures)
+    return signatures, templates, template_labels(templates, template_index)
+
+def output_frame(urls_df, group_index_mapping):
+    """The output columns in report order (group number, then URL), in their compact dtypes"""
+    # Numeric group index for sorting (999999 for empty groups to put them at end)
+    group_index = urls_df['group'].map(group_index_mapping).fillna(999999)
+
+    # One sort by group index (1,2,3...) then URL, and a single copy of the output columns
+    order = pd.DataFrame({'group_index': group_index, 'url': urls_df['url']}).sort_values(
+        ['group_index', 'url'], kind='stable').index
+    # Categorical text and nullable small ints: a fraction of the memory of object columns
+    return compact_frame(urls_df.loc[order, OUTPUT_COLUMNS], keep=('url',))
+
+def process_urls(urls, domain, use_cache=True, scrape_engine='threads', html_parser=None,
+                 host_rps=DEFAULT_HOST_RPS, main_site_rps=MAIN_SITE_RPS, resume=False, incremental=False,
+                 export_formats=('xlsx',), trace_memory=False, profile_stage=None, parse_workers=None,
+                 site_urls_path='site-urls.json', inventory_path='inventory.json', shared_scraper=None,
+                 grouping='pattern', group_depth=None, template_similarity=None, normalize_segments=False,
+                 max_workers=None):
+    if html_parser:
+        set_default_parser(html_parser)
+    # Per-stage timings, memory and fetch statistics, written to metrics.json in the customer folder
+    metrics = RunMetrics(trace_memory=trace_memory, profile_stage=profile_stage)
+    
+    with metrics.stage('load'):
+        # Stream inventory.json into a URL -> block names index
+        inventory = Inventory(inventory_path)
+        template_index = inventory.template_index
+
+        # Create initial dataframe
+        urls_df = pd.DataFrame(urls)
+
+    # Incremental mode: diff against the previous run's manifest and reuse its results for kept URLs
+    manifest = None
+    previous_results = {}
+    previous_features = {}
+    if incremental:
+        manifest = RunManifest.load(manifest_path(domain))
+        urls_df['id'] = [url_id(entry) for entry in urls]
+        url_diff = manifest.diff(urls)
+        print(f"🔁 Incremental run: {len(url_diff['added'])} added, {len(url_diff['removed'])} removed, "
+              f"{len(url_diff['kept'])} unchanged URLs since the last run")
+        kept = set(url_diff['kept'])
+        # Only final outcomes are reused; kept URLs that failed last time (timeouts, 5xx...) are scraped again
+        previous_results = {url: ScrapeResult.from_dict(result)
+                            for url, result in manifest.previous('result').items()
+                            if url in kept and result.get('status') in FINAL_STATUSES}
+        if len(previous_results) < len(kept):
+            print(f"   🔄 {len(kept) - len(previous_results)} unchanged URLs without a final result are scraped again")
+        previous_locales = manifest.previous('locale')
+        previous_features = {url: (pattern, previous_locales[url])
+                             for url, pattern in manifest.previous('pattern').items()
+                             if url in kept and url in previous_locales}
+
+    # Scrape URLs for form and iframe detection, reusing unchanged pages from the on-disk cache
+    # (in batch mode the shared scraper brings its own cache and rate limits)
+    cache = ScrapeCache() if use_cache and not shared_scraper else None
+    # Third-party hosts get their own, slower buckets; the main site runs at its full allowed rate
+    rate_limiter = HostRateLimiter(rate=host_rps, burst=host_rps,
+                                   host_rates={domain: (main_site_rps, main_site_rps)})
+    # Every finished URL is appended to a checkpoint journal; --resume skips URLs already in it
+    journal = CheckpointJournal(checkpoint_path(domain))
+    content_results = journal.load() if resume else {}
+    content_results = {**previous_results, **content_results}
+    pending_urls = [url for url in urls_df['url'] if url not in content_results]
+    if resume:
+        print(f"♻️  Resuming: {len(content_results)} URLs loaded from {journal.path}, {len(pending_urls)} left to scrape")
+    journal.open(resume=resume)
+    
+    def record_result(url, result):
+        journal.record(url, result)
+        content_results[url] = result
+    
+    try:
+        with metrics.stage('scrape'):
+            if shared_scraper:
+                shared_scraper.scrape(pending_urls, sink=record_result, name=domain, metrics=metrics)
+            else:
+                # max_workers sizes the thread pool, or the asyncio engine's pages in flight
+                concurrency = {}
+                if max_workers:
+                    concurrency = {'max_concurrency' if scrape_engine == 'asyncio' else 'max_workers': max_workers}
+                scrape_urls_for_content(pending_urls, cache=cache, engine=scrape_engine,
+                                        rate_limiter=rate_limiter, sink=record_result, metrics=metrics,
+                                        parse_workers=parse_workers, **concurrency)
+    finally:
+        journal.close()
+        if cache:
+            cache.close()
+    
+    with metrics.stage('features'):
+        urls_df = add_url_features(urls_df, content_results, previous_features)
+        if not manifest:
+            # The results now live in the frame's columns; only the manifest needs them as objects
+            content_results = None
 
-    # First sort URLs alphabetically within each group
-    df = df.sort_values('url', ascending=True)
+    with metrics.stage('grouping'):
+        urls_df['group'], group_index_mapping = group_patterns(urls_df['pattern'], grouping=grouping,
+                                                               group_depth=group_depth,
+                                                               normalize_segments=normalize_segments)
 
-    # Then sort by group index (1,2,3...) and maintain URL order
-    df = df.sort_values(['group_index', 'url'], ascending=[True, True])
+    with metrics.stage('templates'):
+        urls_df['template_details'], urls_df['template'], labels = template_columns(urls_df['url'], template_index,
+                                                                                    template_similarity)
+        if manifest:
+            changed = manifest.changed(urls_df, details_labels=labels['template_details'])
+            print(f"🔁 {len(changed)} unchanged URLs have a new template signature or source")
 
-    # Remove helper columns but keep form and iframe data
-    df = df[['url', 'source', 'group', 'locale', 'template', 'template_details', 
-             'has_forms', 'form_count', 'form_types', 'form_details', 
-             'has_iframes', 'iframe_count', 'iframe_sources', 'iframe_details',
-             'iframe_forms_count', 'iframe_with_forms_count', 'iframe_forms_details', 'scrape_status']]
+    with metrics.stage('sort'):
+        df = output_frame(urls_df, group_index_mapping)
+        metrics.record_frame('urls', memory_report(urls_df))
+        metrics.record_frame('output', memory_report(df))
+        # The manifest needs two columns that are not exported; everything else comes from the compact frame
+        manifest_df = (df[['url', 'source', 'locale', 'template_details']].join(urls_df[['id', 'pattern']])
+                       if manifest else None)
+        # Only the compact frame (and the template labels) are kept from here on
+        del urls_df, inventory, template_index
+        print(f"🧮 Output frame: {metrics.frames['output']['total_mb']} MB in memory, "
+              f"{metrics.frames['urls']['total_mb']} MB working frame released "
+              f"(largest columns: {', '.join(list(metrics.frames['output']['columns_mb'])[:3])})")
 
     # Get domain name from the originUrl
     output_filename = f"amsbasic-{domain}.xlsx"
 
-    # Generate analysis report and get customer folder
-    report_filename, customer_folder = generate_analysis_report(df, domain, output_filename)
+    with metrics.stage('report'):
+        # Generate analysis report and get customer folder
+        report_filename, customer_folder = generate_analysis_report(df, domain, output_filename,
+                                                                   site_urls_path=site_urls_path,
+                                                                   inventory_path=inventory_path,
+                                                                   labels=labels)
     
-    # Save the Excel result to customer folder
-    excel_path = f"{customer_folder}/{output_filename}"
-    df.to_excel(excel_path, index=False)
-    print(f"✅ Excel exported: {excel_path}")
+    with metrics.stage('export'):
+        # Save the Excel result (and any other requested formats) to customer folder
+        excel_path = f"{customer_folder}/{output_filename}"
+        for export_path in export_dataframe(df, excel_path, formats=export_formats, split_by='group', labels=labels):
+            print(f"✅ Exported: {export_path}")
+
+    # The run is complete, so the checkpoint is no longer needed
+    journal.remove()
+    if manifest:
+        manifest.update(manifest_df, content_results, details_labels=labels['template_details'])
+        manifest.save()
+        print(f"✅ Run manifest saved: {manifest.path}")
+
+    # Written last: the report stage recreates the customer folder
+    metrics_path = metrics.write(customer_folder)
+    print(f"✅ Metrics written: {metrics_path} ({metrics.summary()})")
 
     return True
 
-def generate_analysis_report(df, domain, output_filename):
+def process_batch(site_pairs, max_customers=4, max_workers=8, use_cache=True, host_rps=DEFAULT_HOST_RPS,
+                  main_site_rps=MAIN_SITE_RPS, parse_workers=None, **options):
+    """Run process_urls for several (site-urls, inventory) pairs concurrently on one shared scraper
+    
+    Up to `max_customers` customers are processed at once; their URLs share the
+    scraper's workers fairly. Each customer gets its own output folder, and a
+    failing customer is reported without stopping the others. Returns
+    {site-urls path: 'Success' or the error}.
+    """
+    sites = {}
+    folders = {}
+    outcomes = {}
+    for site_path, inventory_path in site_pairs:
+        try:
+            customer_name, domain, urls = load_site(site_path)
+        except Exception as e:
+            outcomes[site_path] = f"Failed: could not read {site_path}: {e}"
+            continue
+        # Customers writing to the same folder (or checkpoint, keyed by domain) would overwrite each other
+        clash = folders.get(customer_name) or folders.get(domain)
+        if clash:
+            outcomes[site_path] = f"Failed: same customer or domain as {clash}"
+            continue
+        folders[customer_name] = folders[domain] = site_path
+        sites[site_path] = (inventory_path, domain, urls)
+    
+    print(f"📦 Batch: {len(sites)} customers, {max_customers} at a time, sharing {max_workers} scrape workers")
+    if options.pop('scrape_engine', 'threads') != 'threads':
+        print("⚠️  Batch runs scrape with the shared thread scraper; the asyncio engine is not used")
+    if options.get('trace_memory') and max_customers > 1 and len(sites) > 1:
+        # tracemalloc sees every thread's allocations, so concurrent customers would skew each other's peaks
+        options.pop('trace_memory')
+        print("⚠️  Stage memory tracing is process-wide; run the batch with --batch-customers 1 to record it")
+    shared_scraper = SharedScraper(max_workers=max_workers, use_cache=use_cache, host_rps=host_rps,
+                                   host_rates={domain: (main_site_rps, main_site_rps)
+                                               for _, domain, _ in sites.values()},
+                                   parse_workers=parse_workers)
+    
+    def run(site_path):
+        inventory_path, domain, urls = sites[site_path]
+        try:
+            process_urls(urls, domain, site_urls_path=site_path, inventory_path=inventory_path,
+                         shared_scraper=shared_scraper, **options)
+            return 'Success'
+        except Exception as e:
+            print(f"❌ {site_path} failed:")
+            traceback.print_exc()
+            return f"Failed: {str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__}"
+    
+    try:
+        with ThreadPoolExecutor(max_workers=max_customers) as executor:
+            outcomes.update(zip(sites, executor.map(run, sites)))
+    finally:
+        shared_scraper.close()
+    
+    print("📦 Batch summary:")
+    for site_path, _ in site_pairs:
+        if site_path in outcomes:
+            print(f"   {'✅' if outcomes[site_path] == 'Success' else '❌'} {site_path}: {outcomes[site_path]}")
+    return outcomes
+
+def generate_analysis_report(df, domain, output_filename, site_urls_path='site-urls.json',
+                             inventory_path='inventory.json', labels=None):
     """Generate comprehensive analysis report from the DataFrame"""
-    from collections import defaultdict, Counter
     import shutil
-    import json
     
     # Read customer name from site-urls.json
     try:
-        with open('site-urls.json', 'r') as f:
+        with open(site_urls_path, 'r') as f:
             site_data = json.load(f)
         customer_name = site_data.get('customerName', 'Unknown Customer')
     except Exception as e:
@@ -492,262 +648,18 @@ def generate_analysis_report(df, domain, output_filename):
     # Create report filename in customer folder
     report_filename = f"{customer_folder}/{output_filename.replace('.xlsx', '_analysis.txt')}"
     
+    # Every statistic is aggregated up front; the text report only renders the tables
+    stats = compute_report_stats(df, labels=labels)
     with open(report_filename, 'w') as f:
-        f.write("=" * 80 + "\n")
-        f.write("URL PATTERN GROUPER ANALYSIS REPORT\n")
-        f.write("=" * 80 + "\n\n")
-        
-        # 1. Main site URL and basic info
-        f.write("1. BASIC INFORMATION\n")
-        f.write("-" * 50 + "\n")
-        f.write(f"Customer: {customer_name}\n")
-        f.write(f"Main Site URL: https://{domain}\n")
-        f.write(f"Total Pages Analyzed: {len(df)}\n")
-        f.write(f"Analysis Date: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-        
-        # 2. Form and Iframe Analysis
-        f.write("2. FORM & IFRAME DETECTION ANALYSIS\n")
-        f.write("   (Only tracking iframes that contain forms)\n")
-        f.write("-" * 50 + "\n")
-        content_stats = {
-            'total_pages': len(df),
-            'pages_with_forms': len(df[df['has_forms'] == True]),
-            'pages_without_forms': len(df[df['has_forms'] == False]),
-            'pages_with_iframes': len(df[df['has_iframes'] == True]),
-            'pages_without_iframes': len(df[df['has_iframes'] == False]),
-            'pages_with_iframe_forms': len(df[df['iframe_forms_count'] > 0]),
-            'total_iframe_forms': df['iframe_forms_count'].sum(),
-            'pages_with_both': len(df[(df['has_forms'] == True) & (df['has_iframes'] == True)]),
-            'pages_with_neither': len(df[(df['has_forms'] == False) & (df['has_iframes'] == False)]),
-            'successful_scrapes': len(df[df['scrape_status'] == 'Success']),
-            'failed_scrapes': len(df[df['scrape_status'] != 'Success'])
-        }
-        
-        f.write(f"Total Pages Scraped: {content_stats['total_pages']}\n")
-        f.write(f"Successful Scrapes: {content_stats['successful_scrapes']} ({(content_stats['successful_scrapes']/content_stats['total_pages'])*100:.1f}%)\n")
-        f.write(f"Failed Scrapes: {content_stats['failed_scrapes']} ({(content_stats['failed_scrapes']/content_stats['total_pages'])*100:.1f}%)\n\n")
-        
-        f.write("FORM ANALYSIS:\n")
-        f.write(f"Pages with Forms: {content_stats['pages_with_forms']} ({(content_stats['pages_with_forms']/content_stats['total_pages'])*100:.1f}%)\n")
-        f.write(f"Pages without Forms: {content_stats['pages_without_forms']} ({(content_stats['pages_without_forms']/content_stats['total_pages'])*100:.1f}%)\n\n")
-        
-        f.write("IFRAME ANALYSIS (Only Iframes with Forms):\n")
-        f.write(f"Pages with Iframes containing Forms: {content_stats['pages_with_iframes']} ({(content_stats['pages_with_iframes']/content_stats['total_pages'])*100:.1f}%)\n")
-        f.write(f"Pages without Iframes containing Forms: {content_stats['pages_without_iframes']} ({(content_stats['pages_without_iframes']/content_stats['total_pages'])*100:.1f}%)\n")
-        f.write(f"Pages with Forms in Iframes: {content_stats['pages_with_iframe_forms']} ({(content_stats['pages_with_iframe_forms']/content_stats['total_pages'])*100:.1f}%)\n")
-        f.write(f"Total Forms Found in Iframes: {content_stats['total_iframe_forms']}\n\n")
-        
-        f.write("COMBINED ANALYSIS:\n")
-        f.write(f"Pages with Both Forms & Iframes: {content_stats['pages_with_both']} ({(content_stats['pages_with_both']/content_stats['total_pages'])*100:.1f}%)\n")
-        f.write(f"Pages with Neither Forms nor Iframes: {content_stats['pages_with_neither']} ({(content_stats['pages_with_neither']/content_stats['total_pages'])*100:.1f}%)\n\n")
-        
-        # Form type analysis
-        if content_stats['pages_with_forms'] > 0:
-            form_types_analysis = df[df['has_forms'] == True]['form_types'].value_counts()
-            f.write("Form Types Distribution:\n")
-            for form_type, count in form_types_analysis.head(10).items():
-                if form_type:
-                    percentage = (count / content_stats['pages_with_forms']) * 100
-                    f.write(f"  {form_type}: {count} pages ({percentage:.1f}%)\n")
-            
-            # Form count analysis
-            form_count_analysis = df[df['has_forms'] == True]['form_count'].value_counts().sort_index()
-            f.write(f"\nForms per Page Distribution:\n")
-            for count, pages in form_count_analysis.items():
-                percentage = (pages / content_stats['pages_with_forms']) * 100
-                f.write(f"  {count} form{'s' if count != 1 else ''}: {pages} pages ({percentage:.1f}%)\n")
-        
-        # Iframe type analysis (only iframes with forms)
-        if content_stats['pages_with_iframes'] > 0:
-            iframe_sources_analysis = df[df['has_iframes'] == True]['iframe_sources'].value_counts()
-            f.write(f"\nIframe Sources Distribution (Only Iframes with Forms):\n")
-            for iframe_source, count in iframe_sources_analysis.head(10).items():
-                if iframe_source:
-                    percentage = (count / content_stats['pages_with_iframes']) * 100
-                    f.write(f"  {iframe_source}: {count} pages ({percentage:.1f}%)\n")
-            
-            # Iframe count analysis
-            iframe_count_analysis = df[df['has_iframes'] == True]['iframe_count'].value_counts().sort_index()
-            f.write(f"\nIframes with Forms per Page Distribution:\n")
-            for count, pages in iframe_count_analysis.items():
-                percentage = (pages / content_stats['pages_with_iframes']) * 100
-                f.write(f"  {count} iframe{'s' if count != 1 else ''} with forms: {pages} pages ({percentage:.1f}%)\n")
-        
-        # Scraping status analysis
-        status_analysis = df['scrape_status'].value_counts()
-        f.write(f"\nScraping Status Breakdown:\n")
-        for status, count in status_analysis.items():
-            percentage = (count / content_stats['total_pages']) * 100
-            f.write(f"  {status}: {count} pages ({percentage:.1f}%)\n")
-        f.write("\n")
-        
-        # 3. Locale Analysis
-        f.write("3. LOCALE ANALYSIS\n")
-        f.write("-" * 50 + "\n")
-        locale_counts = df['locale'].value_counts()
-        f.write(f"Total Locales: {len(locale_counts)}\n")
-        for locale, count in locale_counts.items():
-            percentage = (count / len(df)) * 100
-            f.write(f"  {locale.upper()}: {count} pages ({percentage:.1f}%)\n")
-        f.write("\n")
-        
-        # 4. Similar URL Pattern Analysis
-        f.write("4. SIMILAR URL PATTERN ANALYSIS\n")
-        f.write("-" * 50 + "\n")
-        group_counts = df['group'].value_counts()
-        grouped_pages = df[df['group'] != '']
-        ungrouped_pages = df[df['group'] == '']
-        
-        f.write(f"Total URL Patterns Created: {len(group_counts) - 1}\n")  # Exclude empty group
-        f.write(f"Grouped Pages: {len(grouped_pages)} ({(len(grouped_pages)/len(df))*100:.1f}%)\n")
-        f.write(f"Ungrouped Pages: {len(ungrouped_pages)} ({(len(ungrouped_pages)/len(df))*100:.1f}%)\n\n")
-        
-        # 5. Detailed URL Pattern Analysis with Templates
-        f.write("5. DETAILED URL PATTERN BREAKDOWN\n")
-        f.write("-" * 50 + "\n")
-        
-        # Track template combinations across groups
-        template_cross_group = defaultdict(list)
-        
-        for group in group_counts.index:
-            if group != '' and group_counts[group] >= 5:  # Only significant groups
-                group_data = df[df['group'] == group]
-                template_counts = group_data['template'].value_counts()
-                template_detail_counts = group_data['template_details'].value_counts()
-                
-                # Convert "Group 1" to "URL Pattern 1"
-                pattern_name = group.replace("Group", "URL Pattern")
-                f.write(f"\n{pattern_name}\n")
-                f.write(f"  Total Pages: {len(group_data)}\n")
-                f.write(f"  Template Groups:\n")
-                
-                for template, count in template_counts.items():
-                    if template != '':
-                        f.write(f"    {template}: {count} pages\n")
-                        template_cross_group[template].append((group, count))
-                
-                f.write(f"  Top Template Details:\n")
-                for details, count in template_detail_counts.head(3).items():
-                    if details and str(details) != 'nan':
-                        f.write(f"    \"{details}\": {count} pages\n")
-        
-        # 6. Cross-Pattern Template Analysis
-        f.write("\n\n6. CROSS-PATTERN TEMPLATE ANALYSIS\n")
-        f.write("-" * 50 + "\n")
-        f.write("Template groups appearing in multiple URL patterns with >5 pages:\n\n")
-        
-        cross_group_templates = []
-        for template, groups in template_cross_group.items():
-            if len(groups) > 1:  # Appears in multiple groups
-                total_pages = sum(count for _, count in groups)
-                if total_pages > 5:
-                    cross_group_templates.append((template, groups, total_pages))
-        
-        if cross_group_templates:
-            cross_group_templates.sort(key=lambda x: x[2], reverse=True)
-            for template, groups, total_pages in cross_group_templates:
-                f.write(f"{template} (Total: {total_pages} pages)\n")
-                for group, count in groups:
-                    pattern_name = group.replace("Group", "URL Pattern")
-                    f.write(f"  - {pattern_name}: {count} pages\n")
-                f.write(f"  INSIGHT: Pages with '{template}' template are similar across {len(groups)} URL patterns\n\n")
-        else:
-            f.write("No significant cross-pattern template patterns found.\n\n")
-        
-        # 7. Ungrouped Pages Analysis
-        f.write("7. UNGROUPED PAGES ANALYSIS\n")
-        f.write("-" * 50 + "\n")
-        f.write(f"Total Ungrouped Pages: {len(ungrouped_pages)}\n")
-        
-        if len(ungrouped_pages) > 0:
-            ungrouped_templates = ungrouped_pages['template'].value_counts()
-            ungrouped_template_details = ungrouped_pages['template_details'].value_counts()
-            
-            f.write(f"Template Groups in Ungrouped Pages:\n")
-            for template, count in ungrouped_templates.items():
-                if template != '':
-                    f.write(f"  {template}: {count} pages\n")
-            
-            f.write(f"\nUnique Template Combinations: {len(ungrouped_template_details)}\n")
-            f.write(f"Most Common Template Details in Ungrouped Pages:\n")
-            for details, count in ungrouped_template_details.head(5).items():
-                if details and str(details) != 'nan':
-                    f.write(f"  \"{details}\": {count} pages\n")
-        
-        # 8. Key Insights and Recommendations
-        f.write("\n\n8. KEY INSIGHTS & RECOMMENDATIONS\n")
-        f.write("-" * 50 + "\n")
-        
-        # Calculate insights
-        grouping_efficiency = (len(grouped_pages) / len(df)) * 100
-        avg_group_size = len(grouped_pages) / (len(group_counts) - 1) if len(group_counts) > 1 else 0
-        
-        f.write(f"• Grouping Efficiency: {grouping_efficiency:.1f}% of pages are grouped\n")
-        f.write(f"• Average Group Size: {avg_group_size:.1f} pages per group\n")
-        f.write(f"• Template Diversity: {len(df['template'].unique())} unique template types\n")
-        f.write(f"• Template Combination Diversity: {len(df['template_details'].unique())} unique combinations\n")
-        f.write(f"• Form Coverage: {(content_stats['pages_with_forms']/len(df))*100:.1f}% of pages have forms\n")
-        f.write(f"• Iframe with Forms Coverage: {(content_stats['pages_with_iframes']/len(df))*100:.1f}% of pages have iframes containing forms\n")
-        f.write(f"• Iframe Forms Coverage: {(content_stats['pages_with_iframe_forms']/len(df))*100:.1f}% of pages have forms within iframes\n")
-        f.write(f"• Total Iframe Forms: {content_stats['total_iframe_forms']} forms found within iframes\n")
-        f.write(f"• Scraping Success Rate: {(content_stats['successful_scrapes']/len(df))*100:.1f}%\n\n")
-        
-        if grouping_efficiency < 50:
-            f.write("⚠️  LOW GROUPING EFFICIENCY: Consider lowering the minimum group size threshold\n")
-        elif grouping_efficiency > 80:
-            f.write("✅ HIGH GROUPING EFFICIENCY: Excellent pattern recognition\n")
-        
-        if len(cross_group_templates) > 3:
-            f.write("🔄 HIGH TEMPLATE OVERLAP: Many similar templates across groups - consider template consolidation\n")
-        
-        if len(ungrouped_pages) > len(grouped_pages) * 0.5:
-            f.write("📊 HIGH UNGROUPED DIVERSITY: Many unique pages - good for content variation analysis\n")
-        
-        # Most common locales
-        primary_locale = locale_counts.index[0]
-        f.write(f"🌍 PRIMARY LOCALE: {primary_locale.upper()} ({locale_counts[primary_locale]} pages)\n")
-        
-        if len(locale_counts) > 1:
-            f.write(f"🌐 MULTILINGUAL SITE: {len(locale_counts)} locales detected\n")
-        
-        # Content-specific insights
-        if content_stats['pages_with_forms'] > 0:
-            form_conversion_rate = (content_stats['pages_with_forms'] / len(df)) * 100
-            if form_conversion_rate > 20:
-                f.write(f"📝 HIGH FORM COVERAGE: {form_conversion_rate:.1f}% of pages have forms - excellent for lead generation\n")
-            elif form_conversion_rate < 5:
-                f.write(f"📝 LOW FORM COVERAGE: Only {form_conversion_rate:.1f}% of pages have forms - consider adding more conversion opportunities\n")
-            else:
-                f.write(f"📝 MODERATE FORM COVERAGE: {form_conversion_rate:.1f}% of pages have forms\n")
-        
-        if content_stats['pages_with_iframes'] > 0:
-            iframe_coverage_rate = (content_stats['pages_with_iframes'] / len(df)) * 100
-            if iframe_coverage_rate > 30:
-                f.write(f"🖼️  HIGH IFRAME WITH FORMS USAGE: {iframe_coverage_rate:.1f}% of pages have iframes containing forms - embedded conversion opportunities\n")
-            elif iframe_coverage_rate < 10:
-                f.write(f"🖼️  LOW IFRAME WITH FORMS USAGE: Only {iframe_coverage_rate:.1f}% of pages have iframes containing forms\n")
-            else:
-                f.write(f"🖼️  MODERATE IFRAME WITH FORMS USAGE: {iframe_coverage_rate:.1f}% of pages have iframes containing forms\n")
-        
-        if content_stats['pages_with_iframe_forms'] > 0:
-            iframe_form_rate = (content_stats['pages_with_iframe_forms'] / len(df)) * 100
-            if iframe_form_rate > 10:
-                f.write(f"📝 HIGH IFRAME FORM USAGE: {iframe_form_rate:.1f}% of pages have forms within iframes - embedded conversion opportunities\n")
-            elif iframe_form_rate > 0:
-                f.write(f"📝 IFRAME FORMS DETECTED: {iframe_form_rate:.1f}% of pages have forms within iframes ({content_stats['total_iframe_forms']} total forms)\n")
-        
-        if content_stats['failed_scrapes'] > len(df) * 0.1:
-            f.write(f"⚠️  HIGH SCRAPING FAILURE RATE: {(content_stats['failed_scrapes']/len(df))*100:.1f}% failed - check site accessibility\n")
-        
-        f.write("\n" + "=" * 80 + "\n")
-        f.write("END OF ANALYSIS REPORT\n")
-        f.write("=" * 80 + "\n")
+        write_report(f, stats, customer_name, domain)
+    with open(report_filename.replace('.txt', '.json'), 'w') as f:
+        json.dump({'customer': customer_name, 'domain': domain, **stats}, f, indent=2)
     
     # Copy source JSON files to customer folder
     try:
-        shutil.copy2("site-urls.json", f"{customer_folder}/site-urls.json")
-        shutil.copy2("inventory.json", f"{customer_folder}/inventory.json")
-        print(f"✅ Source files copied to customer folder")
+        shutil.copy2(site_urls_path, f"{customer_folder}/site-urls.json")
+        shutil.copy2(inventory_path, f"{customer_folder}/inventory.json")
+        print("✅ Source files copied to customer folder")
     except Exception as e:
         print(f"⚠️  Warning: Could not copy source files: {e}")
     